@@ -1,5 +1,5 @@
-from fastapi import FastAPI, Request, Form, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, Request, Form, BackgroundTasks, HTTPException
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,6 +9,11 @@ import json
 from pathlib import Path
 import time
 import asyncio
+from typing import Optional
+
+# Same search tracking and result shape as the full app, so the shared UI works here too
+from app.models import MatchedJob
+from app.services.job_registry import SSE_HEADERS, ScrapingStatus, job_registry, parse_last_event_id
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,20 +40,6 @@ if static_path.exists():
 templates_path = Path(__file__).parent.parent / "app" / "templates"
 templates = Jinja2Templates(directory=str(templates_path)) if templates_path.exists() else None
 
-# Job scraping status tracking
-class ScrapingStatus:
-    def __init__(self):
-        self.is_scraping = False
-        self.total_jobs = 0
-        self.scraped_jobs = 0
-        self.current_step = "Not started"
-        self.progress = 0
-        self.result = []
-        self.message = ""
-        self.error = None
-
-scraping_status = ScrapingStatus()
-
 # Root endpoint serving the HTML template
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -62,20 +53,23 @@ async def home(request: Request):
 async def health_check():
     return {"status": "healthy"}
 
-@app.get("/api/status")
-async def get_status():
-    return {
-        "is_scraping": scraping_status.is_scraping,
-        "total_jobs": scraping_status.total_jobs,
-        "scraped_jobs": scraping_status.scraped_jobs,
-        "current_step": scraping_status.current_step,
-        "progress": scraping_status.progress,
-        "message": scraping_status.message,
-        "error": scraping_status.error
-    }
+@app.get("/api/status/{search_id}")
+async def get_status(search_id: str):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    return scraping_status.to_dict()
 
-@app.get("/api/results")
-async def get_results():
+@app.get("/api/results/{search_id}")
+async def get_results(search_id: str, cursor: Optional[int] = None):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    
+    # With a cursor, return the jobs and matches produced since the last call
+    if cursor is not None:
+        return scraping_status.results_since(cursor)
+    
     if scraping_status.error:
         return JSONResponse(
             status_code=500,
@@ -84,6 +78,19 @@ async def get_results():
     
     return scraping_status.result
 
+@app.get("/api/events/{search_id}")
+async def stream_events(search_id: str, request: Request):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        scraping_status.sse_stream(last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
 # Simulated job search for Vercel deployment
 @app.post("/api/search")
 async def search_jobs(background_tasks: BackgroundTasks, 
@@ -94,12 +101,13 @@ async def search_jobs(background_tasks: BackgroundTasks,
                       jobNature: str = Form(""),
                       skills: str = Form("")):
     
-    # Reset status
-    scraping_status.__init__()
+    scraping_status = job_registry.create()
+    scraping_status.is_scraping = True
     
     # Start background task for simulated job search
     background_tasks.add_task(
         simulated_job_search,
+        scraping_status,
         position,
         location,
         experience,
@@ -108,39 +116,36 @@ async def search_jobs(background_tasks: BackgroundTasks,
         skills
     )
     
-    return {"message": "Job search started", "status": "processing"}
+    return {"message": "Job search started", "status": "processing", "search_id": scraping_status.search_id}
 
 # Simulated job search function 
-async def simulated_job_search(position, location, experience, salary, job_nature, skills):
+async def simulated_job_search(scraping_status: ScrapingStatus, position, location, experience, salary,
+                               job_nature, skills):
     try:
-        scraping_status.is_scraping = True
-        scraping_status.current_step = "Initializing job search"
-        scraping_status.progress = 5
+        scraping_status.update("Initializing job search", 5)
         await asyncio.sleep(1)  # Simulate delay
         
-        scraping_status.current_step = "Searching for jobs"
-        scraping_status.progress = 20
+        scraping_status.update("Searching for jobs", 20)
         await asyncio.sleep(2)  # Simulate delay
         
         scraping_status.current_step = "Collecting job details"
         scraping_status.total_jobs = 5
         for i in range(5):
             scraping_status.scraped_jobs = i + 1
-            scraping_status.progress = 20 + (i + 1) * 10
+            scraping_status.update(progress=20 + (i + 1) * 10)
             await asyncio.sleep(1)  # Simulate delay
         
-        scraping_status.current_step = "Analyzing with AI"
-        scraping_status.progress = 80
+        scraping_status.update("Analyzing with AI", 80)
         await asyncio.sleep(2)  # Simulate delay
         
         # Sample job results
         sample_jobs = [
             {
                 "id": 1,
-                "title": f"{position} Engineer",
+                "job_title": f"{position} Engineer",
                 "company": "Example Corp",
                 "location": location,
-                "description": f"Looking for a skilled {position} engineer with {experience} experience...",
+                "job_description": f"Looking for a skilled {position} engineer with {experience} experience...",
                 "salary": salary or "$120,000 - $150,000",
                 "job_nature": job_nature or "Remote",
                 "skills_required": skills or "Python, JavaScript, SQL",
@@ -149,10 +154,10 @@ async def simulated_job_search(position, location, experience, salary, job_natur
             },
             {
                 "id": 2,
-                "title": f"Senior {position}",
+                "job_title": f"Senior {position}",
                 "company": "Tech Solutions Inc",
                 "location": location,
-                "description": f"Seeking experienced {position} professional with {experience} years...",
+                "job_description": f"Seeking experienced {position} professional with {experience} years...",
                 "salary": salary or "$130,000 - $160,000",
                 "job_nature": job_nature or "Hybrid",
                 "skills_required": skills or "Java, AWS, Kubernetes",
@@ -161,10 +166,10 @@ async def simulated_job_search(position, location, experience, salary, job_natur
             },
             {
                 "id": 3,
-                "title": f"{position} Specialist",
+                "job_title": f"{position} Specialist",
                 "company": "Innovative Systems",
                 "location": location,
-                "description": f"Join our team as a {position} specialist...",
+                "job_description": f"Join our team as a {position} specialist...",
                 "salary": salary or "$110,000 - $140,000",
                 "job_nature": job_nature or "On-site",
                 "skills_required": skills or "C++, Python, Docker",
@@ -173,14 +178,19 @@ async def simulated_job_search(position, location, experience, salary, job_natur
             }
         ]
         
-        scraping_status.current_step = "Completed"
-        scraping_status.progress = 100
-        scraping_status.result = sample_jobs
+        for job in sample_jobs:
+            scraping_status.publish("job", job)
+        matches = [MatchedJob.from_job(job).dict() for job in sample_jobs]
+        for match in matches:
+            scraping_status.publish("match", match)
+        
+        scraping_status.result = matches
+        scraping_status.update("Completed", 100)
         
     except Exception as e:
         scraping_status.error = str(e)
     finally:
-        scraping_status.is_scraping = False
+        scraping_status.finish()
 
 # Create handler for Vercel
 handler = Mangum(app)
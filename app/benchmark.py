@@ -0,0 +1,366 @@
+"""Offline load benchmark of the search pipeline.
+
+Recorded Indeed detail pages are served by a local HTTP stand-in and matched
+by a deterministic fake LLM, so neither Indeed nor Gemini is contacted. The
+API runs in-process under uvicorn and is driven through /api/search and
+/api/results by concurrent clients. Run with::
+
+    python -m app.benchmark [--searches 50] [--concurrency 10] [--llm-latency 0.5]
+
+Pages come from ``$DEBUG_DUMP_DIR/detail_pages`` (see ``SCRAPE_HTML_PARSER``
+in the README); synthetic pages are generated when none are recorded.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import re
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Keep the benchmark's caches and job index out of ./data
+for _store in ("SCRAPE_CACHE_DISK", "JOB_STORE_DISK", "DETAIL_CACHE_DISK"):
+    os.environ.setdefault(_store, "0")
+
+import httpx
+import uvicorn
+
+from app import integrated_api
+from app.scraper.detail_fetcher import fetch_detail_pages
+from app.scraper.indeed import extract_job_data
+from app.services import job_matcher
+from app.services.executor import scrape_pool
+from app.services.sources import JobSource
+
+PROMPT_ID_RE = re.compile(r'"id":(\d+)')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "mean": round(statistics.mean(values), 4) if values else 0.0,
+    }
+
+
+class StageRecorder:
+    """Latencies per pipeline stage, plus the peak traced memory while each stage ran.
+
+    A sampler thread reads tracemalloc every ``interval`` seconds and charges
+    the reading to every stage active at that moment.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.latencies: Dict[str, List[float]] = {}
+        self.peak_memory: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @contextmanager
+    def track(self, stage: str):
+        with self._lock:
+            self._active[stage] = self._active.get(stage, 0) + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._active[stage] -= 1
+                self.latencies.setdefault(stage, []).append(elapsed)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            with self._lock:
+                for stage, active in self._active.items():
+                    if active:
+                        self.peak_memory[stage] = max(self.peak_memory.get(stage, 0), current)
+
+    def start(self):
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._sampler.join()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: dict(summarize(values), peak_memory_mb=round(self.peak_memory.get(stage, 0) / 2 ** 20, 2))
+            for stage, values in self.latencies.items()
+        }
+
+
+def synthetic_pages(count: int) -> Dict[str, str]:
+    pages = {}
+    for i in range(count):
+        pages[f"synthetic{i:04d}"] = f"""
+        <html><body><div class="jobsearch-JobComponent">
+          <h1 data-testid="jobsearch-JobInfoHeader-title">Software Engineer {i}<span> - job post</span></h1>
+          <div data-testid="inlineHeader-companyName"><a>Company {i % 17}</a></div>
+          <p>Rs {50 + i % 50},000 - Rs {100 + i % 50},000 a month</p>
+          <p>Job Type: Full-time</p>
+          <ul><li>{i % 6} years of Python experience</li><li>Django, REST APIs</li></ul>
+          <div>{"We build data pipelines and web services. " * 40}Work location: In person</div>
+        </div></body></html>
+        """
+    return pages
+
+
+def load_pages(corpus_dir: str, synthetic: int) -> Dict[str, str]:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages or synthetic_pages(synthetic)
+
+
+def start_page_server(pages: Dict[str, str], latency: float) -> ThreadingHTTPServer:
+    """Serve ``/viewjob?jk=<key>`` from the recorded pages, like Indeed's detail URLs."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            job_key = parse_qs(urlparse(self.path).query).get("jk", [""])[0]
+            html = pages.get(job_key)
+            if latency:
+                time.sleep(latency)
+            body = (html or "not found").encode("utf-8")
+            self.send_response(200 if html else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RecordedSource(JobSource):
+    """Job source that fetches and parses recorded detail pages over HTTP."""
+
+    name = "recorded"
+
+    def __init__(self, base_url: str, job_keys: List[str], recorder: StageRecorder):
+        super().__init__()
+        self.base_url = base_url
+        self.job_keys = job_keys
+        self.recorder = recorder
+        self._offset = 0
+
+    def _scrape(self, job_keys, location):
+        pages = fetch_detail_pages(job_keys, {}, "job-finder-benchmark", base_url=self.base_url)
+        with self.recorder.track("parse"):
+            return [
+                dict(extract_job_data(html, job_id=i, location=location, apply_link=key), job_key=key)
+                for i, (key, (html, _)) in enumerate(pages.items(), 1) if html
+            ]
+
+    async def search(self, query, timings=None):
+        # Rotate through the corpus so searches see different pages
+        count = min(query.max_jobs or 10, len(self.job_keys))
+        start, self._offset = self._offset, (self._offset + count) % len(self.job_keys)
+        job_keys = [self.job_keys[(start + i) % len(self.job_keys)] for i in range(count)]
+        with self.recorder.track("scrape"):
+            jobs = await scrape_pool.run(self._scrape, job_keys, query.location)
+        for job in jobs:
+            yield job
+
+
+class FakeLLM:
+    """Deterministic stand-in for GeminiClient with a configurable latency."""
+
+    def __init__(self, latency: float, recorder: StageRecorder):
+        self.latency = latency
+        self.recorder = recorder
+        self.calls = 0
+
+    def is_configured(self) -> bool:
+        return True
+
+    def _items(self, prompt: str) -> List[Dict[str, Any]]:
+        ids = [int(ref) for ref in PROMPT_ID_RE.findall(prompt)]
+        return [{"id": ref, "match_score": max(0, 100 - 7 * (ref - 1)), "rationale": "Benchmark match"}
+                for ref in ids]
+
+    async def generate(self, prompt: str, **kwargs: Any) -> str:
+        self.calls += 1
+        with self.recorder.track("llm"):
+            await asyncio.sleep(self.latency)
+            return json.dumps(self._items(prompt))
+
+    async def stream(self, prompt: str, **kwargs: Any):
+        self.calls += 1
+        with self.recorder.track("llm"):
+            items = self._items(prompt)
+            # About a third of the latency passes before the first token
+            await asyncio.sleep(self.latency / 3)
+            yield "["
+            for i, item in enumerate(items):
+                await asyncio.sleep(self.latency * 2 / 3 / max(len(items), 1))
+                yield ("," if i else "") + json.dumps(item)
+            yield "]"
+
+    def stats(self):
+        return {"calls": self.calls, "retries": 0, "errors": 0}
+
+
+def start_api() -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(integrated_api.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_search(client: httpx.AsyncClient, index: int, args, results: Dict[str, List[float]]):
+    position = args.position if args.repeat_queries else f"{args.position} {index}"
+    started = time.perf_counter()
+    response = await client.post("/api/search", data={"position": position, "location": args.location,
+                                                      "max_jobs": str(args.max_jobs)})
+    results["submit"].append(time.perf_counter() - started)
+    if response.status_code != 200:
+        results["rejected"].append(1)
+        return
+    search_id = response.json()["search_id"]
+
+    cursor, first_job = 0, None
+    while True:
+        page = (await client.get(f"/api/results/{search_id}", params={"cursor": cursor})).json()
+        cursor = page["next_cursor"]
+        if first_job is None and (page["jobs"] or page["matches"]):
+            first_job = time.perf_counter() - started
+            results["first_job"].append(first_job)
+        if page["done"]:
+            break
+        await asyncio.sleep(args.poll_interval)
+    results["end_to_end"].append(time.perf_counter() - started)
+
+
+async def drive(base_url: str, args) -> Dict[str, Any]:
+    results: Dict[str, List[float]] = {"submit": [], "first_job": [], "end_to_end": [], "rejected": []}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(index):
+        async with semaphore:
+            await run_search(client, index, args, results)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.searches)))
+        wall = time.perf_counter() - started
+
+    return {
+        "searches": args.searches,
+        "concurrency": args.concurrency,
+        "rejected": len(results["rejected"]),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(results["end_to_end"]) / wall, 3) if wall else 0.0,
+        "latency": {name: summarize(results[name]) for name in ("submit", "first_job", "end_to_end")},
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Latency percentiles that got worse than the baseline by more than ``tolerance``."""
+    regressions = []
+    for group in ("latency", "stages"):
+        for name, current in report[group].items():
+            previous = baseline.get(group, {}).get(name)
+            if not previous:
+                continue
+            for pct in ("p50", "p95", "p99"):
+                if previous[pct] and current[pct] > previous[pct] * (1 + tolerance):
+                    regressions.append(f"{group}.{name}.{pct}: {previous[pct]} -> {current[pct]}")
+    return regressions
+
+
+def main():
+    default_dir = os.path.join(os.getenv("DEBUG_DUMP_DIR", "debug"), "detail_pages")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", default=default_dir)
+    parser.add_argument("--synthetic", type=int, default=50, help="pages to generate when none are recorded")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--max-jobs", type=int, default=10)
+    parser.add_argument("--position", default="Python Developer")
+    parser.add_argument("--location", default="Lahore")
+    parser.add_argument("--repeat-queries", action="store_true", help="reuse one query so the caches are hit")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="seconds per detail page")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="report JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    recorder = StageRecorder()
+    pages = load_pages(args.corpus_dir, args.synthetic)
+    page_server = start_page_server(pages, args.page_latency)
+    base_url = f"http://127.0.0.1:{page_server.server_address[1]}"
+
+    # Swap in the offline source and LLM
+    integrated_api.job_sources[:] = [RecordedSource(base_url, sorted(pages), recorder)]
+    job_matcher.gemini_client = FakeLLM(args.llm_latency, recorder)
+
+    recorder.start()
+    api = start_api()
+    port = api.servers[0].sockets[0].getsockname()[1]
+    try:
+        report = asyncio.run(drive(f"http://127.0.0.1:{port}", args))
+    finally:
+        api.should_exit = True
+        page_server.shutdown()
+    peak = recorder.stop()
+
+    report["pages"] = len(pages)
+    report["stages"] = recorder.report()
+    report["peak_traced_memory_mb"] = round(peak / 2 ** 20, 2)
+    report["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    print(json.dumps(report, indent=4))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
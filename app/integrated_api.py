@@ -1,8 +1,7 @@
-import json
 import os
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, Request, Form, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,8 +12,23 @@ import time
 import asyncio
 
 # Import the scraper and job matcher
-from app.scraper.indeed import scrape_indeed_jobs
-from app.services.job_matcher import match_jobs_with_gemini
+from app.scraper.browser_pool import browser_pool
+from app.scraper.detail_cache import detail_cache
+from app.scraper.indeed import MAX_JOBS
+from app.scraper.indeed_http import http_client
+from app.services.job_matcher import gemini_client, local_matches, match_jobs_async, to_match_result
+from app.services.llm_client import LLMError
+from app.services.executor import llm_pool, scrape_pool
+from app.services.fanout import fan_out
+from app.services.job_registry import SSE_HEADERS, ScrapingStatus, job_registry, parse_last_event_id
+from app.services.job_store import job_store
+from app.services.llm_cache import llm_cache, match_fingerprint
+from app.services.prewarm import Prewarmer, query_tracker
+from app.services.scrape_cache import cache_key, scrape_cache
+from app.services import semantic_index as semantic
+from app.services.sources import SearchQuery, job_sources
+from app.utils.debug import dump_debug_json
+from app.utils.metrics import current_span_log, observe_span, registry, searches_total
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,26 +46,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Upper bound for the per-search max_jobs form field
+MAX_JOBS_LIMIT = int(os.getenv("SCRAPE_MAX_JOBS_LIMIT", "100"))
+# /api/jobs/search starts a live search when the index has fewer fresh hits than this
+JOB_STORE_MIN_HITS = int(os.getenv("JOB_STORE_MIN_HITS", "5"))
+# Expired rows are deleted from the SQLite stores this often, in seconds
+STORE_PURGE_INTERVAL = float(os.getenv("STORE_PURGE_INTERVAL", "3600"))
+# Jobs not seen for this long are dropped from the job index
+JOB_STORE_MAX_AGE = float(os.getenv("JOB_STORE_MAX_AGE", "604800"))
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Set up templates
 templates = Jinja2Templates(directory="app/templates")
 
-# Job scraping status tracking
-class ScrapingStatus:
-    def __init__(self):
-        self.is_scraping = False
-        self.total_jobs = 0
-        self.scraped_jobs = 0
-        self.current_step = "Not started"
-        self.progress = 0
-        self.result = []
-        self.message = ""
-        self.error = None
-
-scraping_status = ScrapingStatus()
-
 # Form data model
 class JobSearchForm(BaseModel):
     position: str
@@ -61,32 +70,89 @@ class JobSearchForm(BaseModel):
     location: str
     skills: Optional[str] = ""
 
-# API to get status
+# API to get service-wide status
 @app.get("/api/status")
-async def get_status():
+async def get_service_status():
     return {
-        "is_scraping": scraping_status.is_scraping,
-        "total_jobs": scraping_status.total_jobs,
-        "scraped_jobs": scraping_status.scraped_jobs,
-        "current_step": scraping_status.current_step,
-        "progress": scraping_status.progress,
-        "message": scraping_status.message,
-        "error": scraping_status.error
+        "searches": job_registry.stats(),
+        "workers": {
+            "scrape": scrape_pool.stats(),
+            "llm": llm_pool.stats()
+        },
+        "browsers": browser_pool.stats(),
+        "scrape_cache": scrape_cache.stats(),
+        "detail_cache": detail_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_client": gemini_client.stats(),
+        "job_store": job_store.stats(),
+        "semantic_index": semantic.semantic_index.stats(),
+        "prewarm": prewarmer.stats()
     }
 
+# API to get status of a single search
+@app.get("/api/status/{search_id}")
+async def get_status(search_id: str):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    return scraping_status.to_dict()
+
+def collect_service_metrics():
+    # Export the counters already kept for /api/status
+    searches = job_registry.stats()
+    yield ("job_finder_searches_in_flight", "gauge", "Searches currently running.",
+           [({}, searches["running"])])
+    yield ("job_finder_stage_pool_queue_depth", "gauge", "Tasks waiting for a worker.",
+           [({"pool": pool.name}, pool.queued) for pool in (scrape_pool, llm_pool)])
+    yield ("job_finder_stage_pool_running", "gauge", "Tasks running in a worker pool.",
+           [({"pool": pool.name}, pool.running) for pool in (scrape_pool, llm_pool)])
+    cache = scrape_cache.stats()
+    # Disjoint buckets: fresh from memory, fresh from disk, stale (either level), miss
+    yield ("job_finder_scrape_cache_requests_total", "counter", "Scrape cache lookups by result.",
+           [({"result": result}, cache[key]) for result, key in
+            (("memory", "memory_hits"), ("disk", "disk_hits"), ("stale", "stale_hits"), ("miss", "misses"))])
+    details = detail_cache.stats()
+    yield ("job_finder_detail_lookups_total", "counter",
+           "Job detail lookups by result; reused ones skipped the detail page fetch.",
+           [({"result": result}, details[result]) for result in ("reused", "changed", "new")])
+    cache = llm_cache.stats()
+    yield ("job_finder_llm_cache_requests_total", "counter", "LLM cache lookups by result.",
+           [({"result": result}, cache[result]) for result in ("hits", "misses", "coalesced")])
+    client = gemini_client.stats()
+    yield ("job_finder_llm_calls_total", "counter", "Gemini calls, including retries.", [({}, client["calls"])])
+    yield ("job_finder_llm_retries_total", "counter", "Retried Gemini calls.", [({}, client["retries"])])
+    yield ("job_finder_llm_errors_total", "counter", "Failed Gemini requests.", [({}, client["errors"])])
+    browsers = browser_pool.stats()
+    yield ("job_finder_cloudflare_solves_total", "counter", "Cloudflare challenges solved.",
+           [({}, browsers["cloudflare_solves"])])
+    yield ("job_finder_browsers_created_total", "counter", "Browser sessions started.",
+           [({}, browsers["created"])])
+    prewarm = prewarmer.stats()
+    yield ("job_finder_prewarm_crawls_total", "counter", "Popular queries re-crawled ahead of time.",
+           [({"result": "ok"}, prewarm["crawls"]), ({"result": "error"}, prewarm["failures"])])
+
+registry.add_collector(collect_service_metrics)
+
+# Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Home page
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 # Background scraping task
-async def scrape_jobs_task(position: str, location: str, experience: str, salary: str, 
-                           job_nature: str, skills: str):
+async def scrape_jobs_task(scraping_status: ScrapingStatus, position: str, location: str,
+                           experience: str, salary: str, job_nature: str, skills: str,
+                           max_jobs: int = 0):
+    # Stage spans anywhere below (including scrape workers) land in this search's log
+    span_token = current_span_log.set(scraping_status.spans)
+    search_started = time.perf_counter()
+    outcome = "ok"
     try:
         scraping_status.is_scraping = True
-        scraping_status.current_step = "Saving user input"
-        scraping_status.progress = 5
-        await asyncio.sleep(0.5)
         
         # Save user input
         user_input = {
@@ -97,101 +163,199 @@ async def scrape_jobs_task(position: str, location: str, experience: str, salary
             "location": location,
             "skills": skills
         }
-        
-        with open("user_input.json", "w", encoding="utf-8") as f:
-            json.dump(user_input, f, ensure_ascii=False, indent=4)
-        
-        scraping_status.current_step = "Preparing to scrape jobs"
-        scraping_status.progress = 15
-        await asyncio.sleep(0.5)
+        dump_debug_json(f"user_input_{scraping_status.search_id}.json", user_input)
         
         # Scrape jobs
-        scraping_status.current_step = f"Scraping jobs for {position} in {location}"
-        scraping_status.progress = 25
-        await asyncio.sleep(0.5)
-        
-        jobs = scrape_indeed_jobs(position, location)
+        scraping_status.total_jobs = (max_jobs or MAX_JOBS) * len(job_sources)
+        scraping_status.update(f"Scraping jobs for {position} in {location}", 10)
         
-        # Update progress
-        scraping_status.progress = 40
-        scraping_status.current_step = "Processing scraped job data"
-        await asyncio.sleep(0.5)
+        # All configured sources are searched concurrently
+        query = SearchQuery(position, location, max_jobs)
+        source_stats = {}
+
+        def on_job(job):
+            scraping_status.scraped_jobs += 1
+            done = min(scraping_status.scraped_jobs, scraping_status.total_jobs)
+            scraping_status.progress = 10 + 50 * done // max(scraping_status.total_jobs, 1)
+            scraping_status.publish("job", job)
+            scraping_status.publish("progress", scraping_status.to_dict())
+
+        async def scrape_live():
+            # Jobs are streamed to the client as each source produces them
+            jobs, stats = await fan_out(query, job_sources, on_job)
+            source_stats.update(stats)
+            dump_debug_json(f"scraped_jobs_{scraping_status.search_id}.json", jobs)
+            # Every scraped job also goes into the local search index
+            await asyncio.to_thread(job_store.upsert, jobs)
+            # Embedded in one batch off the event loop, so offline matching only has to embed the query
+            if semantic.available():
+                await asyncio.to_thread(semantic.semantic_index.add, jobs)
+            return jobs
+
+        async def scrape_refresh():
+            jobs, _ = await fan_out(query, job_sources)
+            await asyncio.to_thread(job_store.upsert, jobs)
+            return jobs
+
+        # Popular queries are answered from the scrape cache
+        scrape_started = time.perf_counter()
+        jobs, source = await scrape_cache.get_or_scrape(
+            search_cache_key(query),
+            scrape_live, refresh=scrape_refresh
+        )
+        observe_span("scrape", time.perf_counter() - scrape_started)
+        scraping_status.timings["scrape"] = {"source": source}
+        if source == "live":
+            scraping_status.timings["scrape"]["sources"] = source_stats
+        else:
+            # Cached jobs weren't streamed; publish them for event and cursor clients
+            for job in jobs:
+                scraping_status.publish("job", job)
         
         scraping_status.total_jobs = len(jobs)
         scraping_status.scraped_jobs = len(jobs)
-        scraping_status.progress = 60
-        await asyncio.sleep(0.5)
         
         if jobs:
-            scraping_status.current_step = f"Found {len(jobs)} jobs. Preparing for AI analysis..."
-            scraping_status.progress = 65
-            await asyncio.sleep(0.5)
-            
             # Process with LLM
-            scraping_status.current_step = "Processing jobs with Gemini AI"
-            scraping_status.progress = 75
-            await asyncio.sleep(0.5)
-            
-            llm_response = match_jobs_with_gemini()
-            
-            scraping_status.progress = 85
-            scraping_status.current_step = "Parsing AI response"
-            await asyncio.sleep(0.5)
+            scraping_status.update(f"Found {len(jobs)} jobs. Processing jobs with Gemini AI", 65)
             
-            # Removing json files which are no longer needed
-            current_file_path = os.path.abspath(__file__)
-            root_dir = os.path.dirname(os.path.dirname(current_file_path))
-            os.remove(os.path.join(root_dir, 'scraped_jobs.json'))
-            os.remove(os.path.join(root_dir, 'user_input.json'))
+            streamed = []
+
+            def on_match(match):
+                # Matches become visible in /api/results as Gemini streams them
+                streamed.append(match)
+                scraping_status.result.append(match)
+                scraping_status.publish("match", match)
             
-            # Parse JSON from LLM response
+            # Identical searches share one cached or in-flight Gemini call
+            match_started = time.perf_counter()
             try:
-                cleaned_json = llm_response.strip()
-                if cleaned_json.startswith("```json"):
-                    cleaned_json = cleaned_json[7:]
-                if cleaned_json.endswith("```"):
-                    cleaned_json = cleaned_json[:-3]
-                
-                parsed_data = json.loads(cleaned_json)
-                scraping_status.result = parsed_data
-                scraping_status.progress = 95
-                scraping_status.current_step = "Finalizing results"
-                await asyncio.sleep(0.5)
-                
-                scraping_status.current_step = "Completed! Found matching jobs."
-                scraping_status.message = "Successfully found matching jobs!"
-            except json.JSONDecodeError:
-                scraping_status.result = jobs  # Fallback to raw jobs if parsing fails
-                scraping_status.progress = 95
-                scraping_status.current_step = "Finalizing results with raw data"
-                await asyncio.sleep(0.5)
-                
-                scraping_status.current_step = "Completed! Using raw job data (LLM parsing failed)."
-                scraping_status.message = "Found jobs but couldn't process AI response. Showing raw results."
+                matches = await llm_cache.get_or_call(
+                    match_fingerprint(user_input, jobs),
+                    lambda: llm_pool.run_async(match_jobs_async, user_input, jobs, on_match),
+                    # An empty answer is never reused for the whole TTL
+                    cacheable=lambda matches: bool(matches)
+                )
+                scraping_status.result = matches
+                # Cached or coalesced responses didn't go through on_match
+                if not streamed:
+                    for match in matches:
+                        scraping_status.publish("match", match)
+                scraping_status.update("Completed! Found matching jobs.", 100,
+                                       "Successfully found matching jobs!")
+            except LLMError:
+                # Fall back to the local ranking if Gemini is unavailable
+                outcome = "fallback"
+                scraping_status.result = await asyncio.to_thread(local_matches, user_input, jobs)
+                if streamed:
+                    # Gemini failed mid-stream: clients drop the matches it already sent
+                    scraping_status.publish("matches_reset", {})
+                for match in scraping_status.result:
+                    scraping_status.publish("match", match)
+                scraping_status.update("Completed! Using locally ranked jobs (AI matching failed).", 100,
+                                       "Found jobs but AI matching is unavailable. Showing locally ranked results.")
+            observe_span("match", time.perf_counter() - match_started)
         else:
-            scraping_status.progress = 90
-            await asyncio.sleep(0.5)
-            
-            scraping_status.current_step = "Completed! No jobs found."
-            scraping_status.message = "No jobs found matching your criteria."
-            
-        scraping_status.progress = 100
+            outcome = "no_jobs"
+            scraping_status.update("Completed! No jobs found.", 100, "No jobs found matching your criteria.")
         
     except Exception as e:
+        outcome = "error"
         scraping_status.error = str(e)
         scraping_status.current_step = "Error occurred"
         scraping_status.message = f"An error occurred: {str(e)}"
     finally:
-        scraping_status.is_scraping = False
+        observe_span("search", time.perf_counter() - search_started)
+        searches_total.inc(outcome=outcome)
+        current_span_log.reset(span_token)
+        scraping_status.finish()
+
+# Server-Sent Events stream of a search's progress, scraped jobs and matches
+@app.get("/api/events/{search_id}")
+async def stream_events(search_id: str, request: Request):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    
+    # Browsers resend the last received id when reconnecting
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        scraping_status.sse_stream(last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+def search_cache_key(query: SearchQuery) -> str:
+    return cache_key(query.position, query.location, query.max_jobs, [s.name for s in job_sources])
+
+async def prewarm_crawl(query: SearchQuery) -> List[Dict[str, Any]]:
+    jobs, _ = await fan_out(query, job_sources)
+    await asyncio.to_thread(job_store.upsert, jobs)
+    return jobs
+
+# Re-crawls popular queries in the background (disabled unless PREWARM_TOP_N > 0)
+prewarmer = Prewarmer(
+    query_tracker, prewarm_crawl, scrape_cache, key=search_cache_key,
+    top_n=int(os.getenv("PREWARM_TOP_N", "0")),
+    interval=float(os.getenv("PREWARM_INTERVAL", "600")),
+    jitter=float(os.getenv("PREWARM_JITTER", "0.2")),
+    concurrency=int(os.getenv("PREWARM_CONCURRENCY", "1")),
+    min_score=float(os.getenv("PREWARM_MIN_SCORE", "2"))
+)
+
+@app.on_event("startup")
+async def start_prewarmer():
+    prewarmer.start()
+
+def purge_stores():
+    scrape_cache.purge_expired()
+    job_store.purge_older_than(max(JOB_STORE_MAX_AGE, job_store.fresh_ttl))
+    if detail_cache.ttl > 0:
+        detail_cache.purge_older_than(detail_cache.ttl)
+
+async def purge_stores_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(purge_stores)
+        except Exception as e:
+            print(f"Purging expired rows failed: {e}")
+        await asyncio.sleep(STORE_PURGE_INTERVAL)
+
+@app.on_event("startup")
+async def start_store_purge():
+    # Keep the SQLite files from growing without bound
+    app.state.purge_task = asyncio.create_task(purge_stores_periodically())
+
+@app.on_event("startup")
+async def warm_browser_pool():
+    # Start browsers and solve Cloudflare before the first search arrives
+    warm_count = int(os.getenv("BROWSER_POOL_WARM", "0"))
+    if warm_count > 0:
+        asyncio.create_task(scrape_pool.run(browser_pool.warm, warm_count))
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    scrape_pool.shutdown()
+    llm_pool.shutdown()
+    browser_pool.close()
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.close()
+
+@app.on_event("shutdown")
+async def stop_prewarmer():
+    await prewarmer.stop()
+
+@app.on_event("shutdown")
+async def stop_store_purge():
+    app.state.purge_task.cancel()
 
 @app.post("/api/search")
 async def search_jobs(background_tasks: BackgroundTasks, position: str = Form(...), 
                       location: str = Form(...), experience: str = Form(""), 
                       salary: str = Form(""), jobNature: str = Form(""), 
-                      skills: str = Form("")):
-    
-    # Reset status
-    scraping_status.__init__()
+                      skills: str = Form(""), max_jobs: int = Form(0)):
     
     # Validate required fields
     if not position or not location:
@@ -200,21 +364,78 @@ async def search_jobs(background_tasks: BackgroundTasks, position: str = Form(..
             content={"error": "Position and location are required fields"}
         )
     
+    if scrape_pool.is_saturated():
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Too many searches in progress, please try again later"}
+        )
+    
+    scraping_status = start_search(background_tasks, position, location, experience, salary,
+                                   jobNature, skills, max_jobs)
+    return {"message": "Job search started", "status": "processing", "search_id": scraping_status.search_id}
+
+def start_search(background_tasks: BackgroundTasks, position: str, location: str, experience: str,
+                 salary: str, job_nature: str, skills: str, max_jobs: int = 0) -> ScrapingStatus:
+    max_jobs = min(max(max_jobs, 0), MAX_JOBS_LIMIT)
+    # Count the query so popular ones get pre-warmed
+    query_tracker.record(position, location, max_jobs)
+    
+    # Register a new search
+    scraping_status = job_registry.create()
+    scraping_status.is_scraping = True
+    
     # Start background task
     background_tasks.add_task(
         scrape_jobs_task, 
+        scraping_status,
         position, 
         location, 
         experience, 
         salary, 
-        jobNature, 
-        skills
+        job_nature, 
+        skills,
+        max_jobs
     )
+    return scraping_status
+
+# Instant search over previously scraped jobs
+@app.get("/api/jobs/search")
+async def search_job_store(background_tasks: BackgroundTasks, position: str, location: str = "",
+                           experience: str = "", salary: str = "", jobNature: str = "",
+                           skills: str = "", limit: int = 20, live: bool = True):
+    started = time.perf_counter()
+    user_input = {
+        "position": position,
+        "experience": experience,
+        "salary": salary,
+        "jobNature": jobNature,
+        "location": location,
+        "skills": skills
+    }
+    jobs = await asyncio.to_thread(job_store.search, user_input, min(max(limit, 1), MAX_JOBS_LIMIT))
+    response = {
+        "jobs": [to_match_result(job, rationale="Found in the local job index") for job in jobs],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "search_id": None
+    }
     
-    return {"message": "Job search started", "status": "processing"}
+    # Too few fresh hits: scrape live, followed via /api/events or /api/results
+    if live and len(jobs) < JOB_STORE_MIN_HITS and location and not scrape_pool.is_saturated():
+        scraping_status = start_search(background_tasks, position, location, experience, salary,
+                                       jobNature, skills)
+        response["search_id"] = scraping_status.search_id
+    return response
 
-@app.get("/api/results")
-async def get_results():
+@app.get("/api/results/{search_id}")
+async def get_results(search_id: str, cursor: Optional[int] = None):
+    scraping_status = job_registry.get(search_id)
+    if scraping_status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired search ID")
+    
+    # With a cursor, return the jobs and matches produced since the last call
+    if cursor is not None:
+        return scraping_status.results_since(cursor)
+    
     if scraping_status.error:
         return JSONResponse(
             status_code=500,
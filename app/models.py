@@ -0,0 +1,52 @@
+from typing import Optional
+
+from pydantic import BaseModel, validator
+
+
+class LLMMatch(BaseModel):
+    """One item of Gemini's structured matching output."""
+    id: int
+    match_score: int = 0
+    rationale: str = ""
+
+    @validator("match_score", pre=True)
+    def clamp_score(cls, value):
+        try:
+            return max(0, min(100, int(round(float(value)))))
+        except (TypeError, ValueError):
+            return 0
+
+
+class MatchedJob(BaseModel):
+    """A scraped job joined with its match score, as returned by /api/results."""
+    job_title: str = "Unknown Title"
+    company_name: str = "Not specified"
+    location: str = ""
+    description: str = ""
+    salary: str = "Not specified"
+    job_type: str = "Not specified"
+    experience_required: str = "Not specified"
+    skills_required: str = "Not specified"
+    job_nature: str = "Not specified"
+    apply_link: str = ""
+    job_key: Optional[str] = None
+    match_score: int = 0
+    rationale: str = ""
+
+    @classmethod
+    def from_job(cls, job, match_score=None, rationale=""):
+        return cls(
+            job_title=job.get("job_title") or "Unknown Title",
+            company_name=job.get("company") or "Not specified",
+            location=job.get("location") or "",
+            description=job.get("job_description") or "",
+            salary=job.get("salary") or "Not specified",
+            job_type=job.get("job_type") or "Not specified",
+            experience_required=job.get("experience_required") or "Not specified",
+            skills_required=job.get("skills_required") or "Not specified",
+            job_nature=job.get("job_nature") or "Not specified",
+            apply_link=job.get("apply_link") or "",
+            job_key=job.get("job_key"),
+            match_score=job.get("match_score", 0) if match_score is None else match_score,
+            rationale=rationale
+        )
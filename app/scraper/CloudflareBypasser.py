@@ -1,10 +1,38 @@
 import time
 from DrissionPage import ChromiumPage
 
+# Finds the turnstile widget inside the page in one evaluation: the shadow host
+# holding the hidden response input, looking through open shadow roots too
+FIND_TURNSTILE_JS = """
+function find(root) {
+    const input = root.querySelector('input[type="hidden"][name*="turnstile"]');
+    if (input) return input.parentElement;
+    for (const el of root.querySelectorAll('*')) {
+        if (el.shadowRoot) {
+            const found = find(el.shadowRoot);
+            if (found) return found;
+        }
+    }
+    return null;
+}
+return find(document);
+"""
+
 class CloudflareBypasser:
-    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True):
+    """Clicks through the Cloudflare turnstile challenge on a DrissionPage tab.
+
+    Gives up after ``max_retries`` retries, i.e. ``max_retries + 1`` clicks
+    (0 for a single click, -1 for no limit), or once ``timeout`` seconds have
+    passed, whichever comes first. ``attempt_stats``
+    records, per attempt, how the button was found and how long it took.
+    """
+
+    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True, timeout=60):
         self.driver = driver
         self.max_retries = max_retries
+        self.timeout = timeout
+        self.attempts = 0
+        self.attempt_stats = []
         self.log = log
 
     def search_recursively_shadow_root_with_iframe(self,ele):
@@ -29,6 +57,17 @@ class CloudflareBypasser:
                     return result
         return None
     
+    def locate_cf_button_with_script(self):
+        """Find the button with one in-page query instead of walking the DOM from Python."""
+        try:
+            host = self.driver.run_js(FIND_TURNSTILE_JS)
+            if host:
+                # The iframe sits in a closed shadow root, out of reach of page scripts
+                return host.shadow_root.child()("tag:body").shadow_root("tag:input")
+        except Exception as e:
+            self.log_message(f"Script search failed: {e}")
+        return None
+
     def locate_cf_button(self):
         button = None
         eles = self.driver.eles("tag:input")
@@ -56,16 +95,23 @@ class CloudflareBypasser:
             print(message)
 
     def click_verification_button(self):
+        """Find and click the button. Returns how it was found ("script", "scan") or None."""
         try:
-            button = self.locate_cf_button()
+            method = "script"
+            button = self.locate_cf_button_with_script()
+            if not button:
+                # Slow path, scales with the page's DOM size
+                method = "scan"
+                button = self.locate_cf_button()
             if button:
                 self.log_message("Verification button found. Attempting to click.")
                 button.click()
-            else:
-                self.log_message("Verification button not found.")
+                return method
+            self.log_message("Verification button not found.")
 
         except Exception as e:
             self.log_message(f"Error clicking verification button: {e}")
+        return None
 
     def is_bypassed(self):
         try:
@@ -75,22 +121,47 @@ class CloudflareBypasser:
             self.log_message(f"Error checking page title: {e}")
             return False
 
+    def wait_until_bypassed(self, timeout=2, poll_interval=0.2):
+        """Poll the page title until the challenge is gone or ``timeout`` passes."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_bypassed():
+                return True
+            time.sleep(poll_interval)
+        return self.is_bypassed()
+
     def bypass(self):
-        
+        """Click until the challenge is gone. Returns whether it was bypassed."""
+        deadline = time.monotonic() + self.timeout
         try_count = 0
+        self.attempt_stats = []
 
         while not self.is_bypassed():
             if 0 < self.max_retries + 1 <= try_count:
                 self.log_message("Exceeded maximum retries. Bypass failed.")
                 break
+            if time.monotonic() >= deadline:
+                self.log_message("Exceeded bypass timeout. Bypass failed.")
+                break
 
             self.log_message(f"Attempt {try_count + 1}: Verification page detected. Trying to bypass...")
-            self.click_verification_button()
+            started = time.monotonic()
+            method = self.click_verification_button()
+            located = time.monotonic()
 
             try_count += 1
-            time.sleep(2)
+            self.attempts = try_count
+            passed = self.wait_until_bypassed(timeout=max(0, min(2, deadline - time.monotonic())))
+            self.attempt_stats.append({
+                "attempt": try_count,
+                "method": method,
+                "locate_seconds": round(located - started, 3),
+                "seconds": round(time.monotonic() - started, 3),
+                "bypassed": passed
+            })
 
         if self.is_bypassed():
             self.log_message("Bypass successful.")
-        else:
-            self.log_message("Bypass failed.")
+            return True
+        self.log_message("Bypass failed.")
+        return False
@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from selenium import webdriver
+from DrissionPage import ChromiumPage
+from .CloudflareBypasser import CloudflareBypasser
+from .waits import wait_for_document_ready
+from app.utils.metrics import cloudflare_attempts_total, observe_span, span
+
+INDEED_HOME_URL = "https://pk.indeed.com"
+CLOUDFLARE_CHECK_URL = "https://www.indeed.com/jobs/"
+CLOUDFLARE_MAX_RETRIES = int(os.getenv("CLOUDFLARE_MAX_RETRIES", "5"))
+CLOUDFLARE_TIMEOUT = float(os.getenv("CLOUDFLARE_TIMEOUT", "60"))
+
+
+class CloudflareBypassError(Exception):
+    """Raised when the Cloudflare challenge couldn't be solved within the retry limits."""
+
+
+class CloudflareSession:
+    """Cookies and user agent obtained from a solved Cloudflare challenge."""
+
+    def __init__(self, cookies: Dict[str, str], user_agent: str, ttl: float):
+        self.cookies = cookies
+        self.user_agent = user_agent
+        self.expires_at = time.time() + ttl
+
+    def is_expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+def solve_cloudflare(ttl: float) -> CloudflareSession:
+    # Launch DrissionPage and bypass Cloudflare
+    with span("cloudflare_bypass"):
+        driver = ChromiumPage()
+        try:
+            return _solve_with(driver, ttl)
+        finally:
+            driver.quit()
+
+
+def _solve_with(driver, ttl: float) -> CloudflareSession:
+    driver.get(CLOUDFLARE_CHECK_URL)
+    cf_bypasser = CloudflareBypasser(driver, max_retries=CLOUDFLARE_MAX_RETRIES, timeout=CLOUDFLARE_TIMEOUT)
+    try:
+        bypassed = cf_bypasser.bypass()
+    finally:
+        cloudflare_attempts_total.inc(cf_bypasser.attempts)
+        for attempt in cf_bypasser.attempt_stats:
+            observe_span("cloudflare_locate", attempt["locate_seconds"])
+            observe_span("cloudflare_attempt", attempt["seconds"])
+    if not bypassed:
+        # Don't hand out (and cache) the cookies of an unsolved challenge
+        raise CloudflareBypassError(f"Cloudflare challenge not solved after {cf_bypasser.attempts} attempts")
+
+    cookies_list = driver.cookies()
+    cookies = {cookie['name']: cookie['value'] for cookie in cookies_list}
+    return CloudflareSession(cookies, driver.user_agent, ttl)
+
+
+def is_challenge_page(driver) -> bool:
+    try:
+        return "just a moment" in driver.title.lower()
+    except Exception:
+        return False
+
+
+class BrowserSession:
+    """A warm headless Selenium browser carrying the Cloudflare cookies."""
+
+    def __init__(self, cf_session: CloudflareSession):
+        self.cf_session = cf_session
+        self.created_at = time.time()
+        self.uses = 0
+        self.broken = False
+
+        # Launch Selenium with cookies
+        options = webdriver.ChromeOptions()
+        options.add_argument(f'user-agent={cf_session.user_agent}')
+        options.add_argument('--headless=new')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        self.driver = webdriver.Chrome(options=options)
+
+        self.driver.get(INDEED_HOME_URL)
+        wait_for_document_ready(self.driver)
+        self.apply_cookies(cf_session)
+
+    def apply_cookies(self, cf_session: CloudflareSession):
+        self.cf_session = cf_session
+        for name, value in cf_session.cookies.items():
+            try:
+                self.driver.add_cookie({'name': name, 'value': value})
+            except Exception:
+                pass
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def is_healthy(self) -> bool:
+        if self.broken:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Pool of reusable browser sessions sharing one cached Cloudflare clearance.
+
+    Sessions are recycled once they exceed ``max_lifetime`` seconds or
+    ``max_uses`` searches, fail a health check, or are marked broken. At most
+    ``max_size`` sessions exist at once; extra callers wait for a free one.
+    """
+
+    def __init__(self, max_size: int = 2, max_lifetime: float = 1800, max_uses: int = 50,
+                 cookie_ttl: float = 1500):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_uses = max_uses
+        self.cookie_ttl = cookie_ttl
+        self._idle: List[BrowserSession] = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._cf_lock = threading.Lock()
+        self._cf_session: Optional[CloudflareSession] = None
+
+        # Metrics
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self.cloudflare_solves = 0
+
+    def cloudflare_session(self, force_refresh: bool = False) -> CloudflareSession:
+        """Return cached Cloudflare cookies, solving a new challenge when needed."""
+        with self._cf_lock:
+            if force_refresh or self._cf_session is None or self._cf_session.is_expired():
+                self._cf_session = solve_cloudflare(self.cookie_ttl)
+                self.cloudflare_solves += 1
+            return self._cf_session
+
+    def refresh_cloudflare(self, session: BrowserSession):
+        """Re-solve the challenge (unless another session already did) and reapply cookies."""
+        stale = session.cf_session
+        with self._cf_lock:
+            if self._cf_session is stale or self._cf_session is None:
+                self._cf_session = solve_cloudflare(self.cookie_ttl)
+                self.cloudflare_solves += 1
+            cf_session = self._cf_session
+        session.apply_cookies(cf_session)
+
+    def _is_reusable(self, session: BrowserSession) -> bool:
+        return (session.age() < self.max_lifetime
+                and session.uses < self.max_uses
+                and not session.cf_session.is_expired()
+                and session.is_healthy())
+
+    def _checkout(self) -> BrowserSession:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                break
+            if self._is_reusable(session):
+                self.reused += 1
+                return session
+            self.recycled += 1
+            session.quit()
+
+        cf_session = self.cloudflare_session()
+        with span("browser_start"):
+            session = BrowserSession(cf_session)
+        self.created += 1
+        return session
+
+    @contextmanager
+    def session(self):
+        """Borrow a browser session for the duration of the ``with`` block."""
+        self._slots.acquire()
+        session = None
+        try:
+            session = self._checkout()
+            session.uses += 1
+            yield session
+        except Exception:
+            if session is not None:
+                session.broken = True
+            raise
+        finally:
+            if session is not None:
+                if session.broken:
+                    self.recycled += 1
+                    session.quit()
+                else:
+                    with self._lock:
+                        self._idle.append(session)
+            self._slots.release()
+
+    def warm(self, count: int = 1):
+        """Start up to ``count`` sessions ahead of time."""
+        sessions = []
+        for _ in range(min(count, self.max_size)):
+            self._slots.acquire()
+            try:
+                sessions.append(self._checkout())
+            finally:
+                self._slots.release()
+        with self._lock:
+            self._idle.extend(sessions)
+
+    def close(self):
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.quit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "idle": len(self._idle),
+            "created": self.created,
+            "reused": self.reused,
+            "recycled": self.recycled,
+            "cloudflare_solves": self.cloudflare_solves
+        }
+
+
+browser_pool = BrowserPool(
+    max_size=int(os.getenv("BROWSER_POOL_SIZE", os.getenv("SCRAPE_WORKERS", "2"))),
+    max_lifetime=float(os.getenv("BROWSER_MAX_LIFETIME", "1800")),
+    max_uses=int(os.getenv("BROWSER_MAX_USES", "50")),
+    cookie_ttl=float(os.getenv("CLOUDFLARE_COOKIE_TTL", "1500"))
+)
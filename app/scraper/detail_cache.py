@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.storage import data_path
+
+
+def snippet_hash(text: str) -> str:
+    """Hash of a job's listing snippet, insensitive to whitespace."""
+    return hashlib.sha1(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+class DetailCache:
+    """Parsed detail records of jobs already scraped, keyed by Indeed job key.
+
+    Each record is stored with the hash of the listing snippet it was found
+    under. On a re-crawl a job whose snippet is unchanged reuses its record
+    instead of opening or fetching its detail page again. Records older than
+    ``ttl`` seconds are fetched again regardless; ``ttl`` 0 disables reuse.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 604800):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Metrics
+        self.reused = 0
+        self.changed = 0
+        self.new = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS job_details ("
+                "job_key TEXT PRIMARY KEY, snippet_hash TEXT NOT NULL, job TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def lookup(self, listings: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Stored records for the ``(job_key, snippet_hash)`` pairs that are unchanged.
+
+        Returns ``{job_key: job}``; keys missing from the result need their
+        detail page fetched.
+        """
+        listings = dict(listing for listing in listings if listing[0])
+        if not listings or self.ttl <= 0:
+            return {}
+        placeholders = ", ".join("?" * len(listings))
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT job_key, snippet_hash, job FROM job_details "
+                f"WHERE job_key IN ({placeholders}) AND fetched_at >= ?",
+                (*listings, time.time() - self.ttl)
+            ).fetchall()
+
+        jobs = {}
+        for job_key, stored_hash, job in rows:
+            if stored_hash == listings[job_key]:
+                jobs[job_key] = json.loads(job)
+            else:
+                self.changed += 1
+        self.reused += len(jobs)
+        self.new += len(listings) - len(rows)
+        return jobs
+
+    def store(self, records: List[Tuple[str, str, Dict[str, Any]]]):
+        """Save ``(job_key, snippet_hash, job)`` records of freshly fetched details."""
+        records = [record for record in records if record[0]]
+        if not records or self.ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO job_details (job_key, snippet_hash, job, fetched_at) VALUES (?, ?, ?, ?)",
+                [(job_key, digest, json.dumps(job, ensure_ascii=False), now) for job_key, digest, job in records]
+            )
+            self.db.commit()
+
+    def purge_older_than(self, max_age: float) -> int:
+        with self._lock:
+            deleted = self.db.execute(
+                "DELETE FROM job_details WHERE fetched_at < ?", (time.time() - max_age,)
+            ).rowcount
+            self.db.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.reused + self.changed + self.new
+        return {
+            "reused": self.reused,
+            "changed": self.changed,
+            "new": self.new,
+            "fetches_avoided_rate": round(self.reused / lookups, 3) if lookups else 0.0
+        }
+
+
+detail_cache = DetailCache(
+    db_path=data_path("job_details.sqlite3") if os.getenv("DETAIL_CACHE_DISK", "1") == "1" else ":memory:",
+    ttl=float(os.getenv("DETAIL_CACHE_TTL", "604800"))
+)
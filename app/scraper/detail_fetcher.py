@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+INDEED_BASE_URL = "https://pk.indeed.com"
+INDEED_VIEWJOB_URL = "{base_url}/viewjob?jk={job_key}"
+
+
+def detail_url(job_key: str, base_url: str = INDEED_BASE_URL) -> str:
+    return INDEED_VIEWJOB_URL.format(base_url=base_url, job_key=job_key)
+
+
+def fetch_detail_pages(job_keys: List[str], cookies: Dict[str, str], user_agent: str,
+                       max_concurrency: int = 5, timeout: float = 15.0,
+                       base_url: str = INDEED_BASE_URL) -> Dict[str, Tuple[Optional[str], float]]:
+    """Fetch Indeed detail pages concurrently, reusing the browser's cookies.
+
+    Returns ``{job_key: (html or None, latency_seconds)}``. A page is None when
+    the request failed or Cloudflare answered with a challenge instead.
+    """
+    headers = {
+        "User-Agent": user_agent,
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "en-US,en;q=0.9"
+    }
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+    with httpx.Client(headers=headers, cookies=cookies, limits=limits, timeout=timeout,
+                      follow_redirects=True) as client:
+
+        def fetch(job_key):
+            started = time.perf_counter()
+            try:
+                response = client.get(detail_url(job_key, base_url))
+                html = response.text if response.status_code == 200 else None
+                if html and "<title>Just a moment" in html:
+                    html = None
+            except httpx.HTTPError:
+                html = None
+            return job_key, (html, time.perf_counter() - started)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return dict(pool.map(fetch, job_keys))
@@ -1,14 +1,46 @@
-import json
+import os
 import time
-import traceback
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from .CloudflareBypasser import CloudflareBypasser
-from DrissionPage import ChromiumPage
+from urllib.parse import quote
+from .browser_pool import browser_pool, is_challenge_page
+from .detail_cache import detail_cache, snippet_hash
+from .detail_fetcher import INDEED_BASE_URL, detail_url, fetch_detail_pages
+from .job_parser import parse_job_detail
+from .waits import (AdaptiveTimeout, ScrapeTimings, job_pane_signature, pane_shows_job, wait_for_document_ready,
+                    wait_for_job_pane)
+from app.utils.debug import dump_debug_text
+from app.utils.metrics import observe_span, span
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+RESULTS_PER_PAGE = 10
+MAX_JOBS = int(os.getenv("SCRAPE_MAX_JOBS", "10"))
+MAX_PAGES = int(os.getenv("SCRAPE_MAX_PAGES", "5"))
+DETAIL_MODE = os.getenv("SCRAPE_DETAIL_MODE", "click")
+DETAIL_CONCURRENCY = int(os.getenv("SCRAPE_DETAIL_CONCURRENCY", "5"))
+
+# Listing text of each result card: title, company, location, salary and snippet only,
+# leaving out relative dates ("Posted 3 days ago") that change every day
+CARD_SNIPPET_SELECTORS = (
+    '[data-testid="company-name"]',
+    '[data-testid="text-location"]',
+    '.salary-snippet-container',
+    '[data-testid="attribute_snippet_testid"]',
+    '.job-snippet',
+)
+CARD_SNIPPETS_JS = """
+var selectors = arguments[1];
+return arguments[0].map(function (title) {
+    var card = title.closest('.job_seen_beacon') || title.closest('li');
+    if (!card) return '';
+    var parts = [title.innerText];
+    selectors.forEach(function (selector) {
+        card.querySelectorAll(selector).forEach(function (el) { parts.push(el.innerText); });
+    });
+    return parts.join('\\n');
+});
+"""
+
 def get_single_element(driver, css_selector, timeout=10):
     try:
         return WebDriverWait(driver, timeout).until(
@@ -32,108 +64,206 @@ def click_element(element):
     except Exception:
         return False
 
-def scrape_indeed_jobs(position, location):
+def get_job_key(job_card):
+    """Indeed's job key (``data-jk``) of a result card's title link, if present."""
     try:
-        # Launch DrissionPage and bypass Cloudflare
-        driver = ChromiumPage()
-        driver.get('https://www.indeed.com/jobs/')
-        cf_bypasser = CloudflareBypasser(driver)
-        cf_bypasser.bypass()
-
-        cookies_list = driver.cookies()
-        cookies = {cookie['name']: cookie['value'] for cookie in cookies_list}
-        user_agent = driver.user_agent
-        driver.quit()
-
-        # Launch Selenium with cookies
-        options = webdriver.ChromeOptions()
-        options.add_argument(f'user-agent={user_agent}')
-        options.add_argument('--headless=new')  
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')  
-        options.add_argument('--disable-dev-shm-usage')
-        selenium_driver = webdriver.Chrome(options=options)
-
-        url = f"https://pk.indeed.com/jobs?q={position.replace(' ', '%20')}&l={location.replace(' ', '%20')}"
-        selenium_driver.get("https://pk.indeed.com")
-        time.sleep(3)
-
-        for name, value in cookies.items():
-            try:
-                selenium_driver.add_cookie({'name': name, 'value': value})
-            except Exception:
-                pass
+        return job_card.find_element(By.CSS_SELECTOR, "a[data-jk]").get_attribute("data-jk")
+    except Exception:
+        return None
+
+def extract_job_data(description_html, job_id, location, apply_link, description_text=None):
+    """Build a job record from the HTML of a job description pane or detail page."""
+    with span("card_parse"):
+        detail = parse_job_detail(description_html, description_text)
+    description_text = detail["description_text"]
+
+    job_data = {
+        "job_id": job_id,
+        "job_title": detail["job_title"],
+        "company": detail["company"],
+        "location": location,
+        "salary": detail["salary"],
+        "job_type": detail["job_type"],
+        "experience_required": detail["experience_required"],
+        "job_nature": "On-site" if 'in person' in description_text.lower() else "Not specified",
+        "apply_link": apply_link,
+        "job_description": description_text
+    }
+
+    return job_data
+
+def search_url(position, location, start=0, base_url=INDEED_BASE_URL):
+    url = f"{base_url}/jobs?q={quote(position)}&l={quote(location)}"
+    if start:
+        url += f"&start={start}"
+    return url
 
+def iter_indeed_jobs(position, location, max_jobs=None, timings=None, detail_mode=None,
+                     base_url=INDEED_BASE_URL):
+    """Yield job records one by one while crawling Indeed result pages.
+
+    Pages are requested with Indeed's ``start=`` offset until ``max_jobs``
+    jobs were yielded, a page has no unseen jobs, or SCRAPE_MAX_PAGES is
+    reached. Jobs are deduplicated by job key across pages. ``base_url``
+    selects the regional Indeed site.
+    """
+    if timings is None:
+        timings = ScrapeTimings()
+    if detail_mode is None:
+        detail_mode = DETAIL_MODE
+    if not max_jobs:
+        max_jobs = MAX_JOBS
+
+    with browser_pool.session() as session:
+        yield from _iter_with_session(session, position, location, max_jobs, timings, detail_mode, base_url)
+
+def _load_results_page(session, url, timings):
+    selenium_driver = session.driver
+    page_started = time.perf_counter()
+    selenium_driver.get(url)
+    wait_for_document_ready(selenium_driver)
+
+    # Cached cookies expired or were rejected: solve the challenge again and retry once
+    if is_challenge_page(selenium_driver):
+        browser_pool.refresh_cloudflare(session)
         selenium_driver.get(url)
+        wait_for_document_ready(selenium_driver)
+    elapsed = time.perf_counter() - page_started
+    timings.page_loads.append(elapsed)
+    observe_span("page_load", elapsed)
+
+def _find_job_cards(selenium_driver):
+    # Find job cards using a more reliable selector
+    job_cards = get_all_elements(selenium_driver, "h2[data-testid='jobTitle']", timeout=5)
+    if not job_cards:
+        # Fallback to the old selector if the new one doesn't work
+        job_cards = get_all_elements(selenium_driver, "h2[class*='jobTitle']", timeout=5)
+    return job_cards
+
+def _card_snippet_hashes(selenium_driver, job_cards, job_keys):
+    """``{job_key: snippet_hash}`` for the cards, read in one script call ({} on failure)."""
+    try:
+        snippets = selenium_driver.execute_script(CARD_SNIPPETS_JS, job_cards, list(CARD_SNIPPET_SELECTORS))
+    except Exception:
+        return {}
+    return {key: snippet_hash(text) for key, text in zip(job_keys, snippets or []) if key and text}
+
+def _iter_with_session(session, position, location, max_jobs, timings, detail_mode, base_url):
+    selenium_driver = session.driver
+    seen_keys = set()
+    job_count = 0
+
+    for page in range(MAX_PAGES):
+        url = search_url(position, location, start=page * RESULTS_PER_PAGE, base_url=base_url)
+        _load_results_page(session, url, timings)
+
+        job_cards = _find_job_cards(selenium_driver)
+        job_keys = [get_job_key(job_card) for job_card in job_cards]
+
+        # Skip jobs already seen on earlier pages (Indeed repeats sponsored posts)
+        new_cards = [(card, key) for card, key in zip(job_cards, job_keys) if key is None or key not in seen_keys]
+        if not new_cards:
+            return
+        seen_keys.update(key for key in job_keys if key)
+        new_cards = new_cards[:max_jobs - job_count]
+        job_cards = [card for card, _ in new_cards]
+        job_keys = [key for _, key in new_cards]
+
+        # Postings unchanged since an earlier crawl reuse their stored details
+        hashes = _card_snippet_hashes(selenium_driver, job_cards, job_keys)
+        reused = detail_cache.lookup(hashes.items())
+        for job_key in job_keys:
+            if job_key in reused:
+                job = reused[job_key]
+                job["location"] = location
+                timings.details_reused += 1
+                job_count += 1
+                job["job_id"] = job_count
+                yield job
+        job_cards = [card for card, key in zip(job_cards, job_keys) if key not in reused]
+        job_keys = [key for key in job_keys if key not in reused]
+
+        # Keys whose description pane never confirmed the switch; their records may be stale
+        unconfirmed = set()
+        if not job_keys:
+            page_jobs = []
+        elif detail_mode == "http" and all(job_keys):
+            page_jobs = _fetch_details_over_http(selenium_driver, job_keys, location, timings, base_url)
+        else:
+            page_jobs = _click_through_cards(selenium_driver, job_cards, job_keys, location, timings, unconfirmed)
+
+        for job in page_jobs:
+            if job["job_key"] in hashes and job["job_key"] not in unconfirmed:
+                detail_cache.store([(job["job_key"], hashes[job["job_key"]], job)])
+            job_count += 1
+            job["job_id"] = job_count
+            yield job
 
-        # Find job cards using a more reliable selector
-        job_cards = get_all_elements(selenium_driver, "h2[data-testid='jobTitle']", timeout=5)
-        if not job_cards:
-            # Fallback to the old selector if the new one doesn't work
-            job_cards = get_all_elements(selenium_driver, "h2[class*='jobTitle']", timeout=5)
+        if job_count >= max_jobs:
+            return
 
-        jobs = []
+def _click_through_cards(selenium_driver, job_cards, job_keys, location, timings, unconfirmed=None):
+    card_timeout = AdaptiveTimeout()
+    pane_signature = job_pane_signature(selenium_driver)
 
-        for i, job_card in enumerate(job_cards[:10], 1):
-            selenium_driver.execute_script("arguments[0].scrollIntoView();", job_card)
+    for job_card, job_key in zip(job_cards, job_keys):
+        selenium_driver.execute_script("arguments[0].scrollIntoView();", job_card)
+        card_started = time.perf_counter()
+        # Indeed opens the first result in the pane before any click
+        already_shown = pane_shows_job(selenium_driver, job_key)
+        if already_shown:
+            new_signature = job_pane_signature(selenium_driver)
+        else:
             clicked = click_element(job_card)
-            time.sleep(3)
-
-            desc_element = get_single_element(selenium_driver, "div.jobsearch-JobComponent", timeout=10)
-
-            if desc_element:
-                description_html = desc_element.get_attribute("outerHTML")
-                description_text = desc_element.text.strip()
-                soup = BeautifulSoup(description_html, 'html.parser')
-                apply_link = selenium_driver.current_url
-                
-                job_title_tag = soup.find(attrs={"data-testid": "jobsearch-JobInfoHeader-title"})
-
-                # Extract the job title
-                job_title = 'Unknown Title'
-                if job_title_tag:
-                    # Remove the nested span that says "- job post", if present
-                    unwanted_span = job_title_tag.find("span", string=lambda text: text and "job post" in text)
-                    if unwanted_span:
-                        unwanted_span.decompose()
-
-                    # Get the cleaned job title
-                    job_title = job_title_tag.get_text(strip=True)
-                
-                # Extract company using data-testid attribute
-                company_element = soup.select_one('div[data-testid="inlineHeader-companyName"] a')
-                if not company_element:
-                    company_element = soup.select_one('div[data-company-name="true"] a')
-                
-                company_name = "Not specified"
-                if company_element:
-                    company_name = company_element.text.strip()
-                    # Remove any nested SVG or irrelevant elements' text
-                    for svg in company_element.select('svg'):
-                        svg.decompose()
-                    company_name = company_element.text.strip()
-
-                job_data = {
-                    "job_id": i,
-                    "job_title": job_title,
-                    "company": company_name,
-                    "location": location,
-                    "salary": next((p.text for p in soup.find_all('p') if 'Rs' in p.text or 'PKR' in p.text), "Not specified"),
-                    "job_type": next((p.text for p in soup.find_all('p') if 'Job Type' in p.text), "Not specified").replace('Job Type:', '').strip(),
-                    "experience_required": next((li.text for li in soup.find_all('li') if 'year' in li.text.lower()), "Not specified"),
-                    "job_nature": "On-site" if 'in person' in description_text.lower() else "Not specified",
-                    "apply_link": apply_link,
-                    "job_description": description_text
-                }
-
-                jobs.append(job_data)
-
-        selenium_driver.quit()
-        
-        with open("scraped_jobs.json", "w", encoding="utf-8") as f:
-            json.dump(jobs, f, ensure_ascii=False, indent=4)
-
-        return jobs
 
-    except Exception:
-        return []
+            # Wait for the description pane to switch to this card instead of sleeping
+            new_signature = wait_for_job_pane(selenium_driver, pane_signature, job_key, card_timeout.value)
+        latency = time.perf_counter() - card_started
+        observe_span("card_wait", latency)
+        timings.card_latencies.append(latency)
+        if new_signature is None:
+            timings.card_timeouts += 1
+            # The pane may still show the previous card
+            if unconfirmed is not None:
+                unconfirmed.add(job_key)
+        else:
+            if not already_shown:
+                card_timeout.observe(latency)
+            pane_signature = new_signature
+
+        desc_element = get_single_element(selenium_driver, "div.jobsearch-JobComponent", timeout=1)
+
+        if desc_element:
+            description_html = desc_element.get_attribute("outerHTML")
+            # Saved panes make up the parser benchmark corpus
+            if job_key:
+                dump_debug_text(f"detail_pages/{job_key}.html", description_html)
+            job = extract_job_data(
+                description_html,
+                job_id=None,
+                location=location,
+                apply_link=selenium_driver.current_url,
+                description_text=desc_element.text.strip()
+            )
+            job["job_key"] = job_key
+            yield job
+
+def _fetch_details_over_http(selenium_driver, job_keys, location, timings, base_url):
+    # Reuse the browser's Cloudflare and Indeed cookies for plain HTTP requests
+    cookies = {cookie['name']: cookie['value'] for cookie in selenium_driver.get_cookies()}
+    user_agent = selenium_driver.execute_script("return navigator.userAgent")
+
+    with span("detail_fetch"):
+        pages = fetch_detail_pages(job_keys, cookies, user_agent, max_concurrency=DETAIL_CONCURRENCY,
+                                   base_url=base_url)
+
+    for job_key in job_keys:
+        html, latency = pages[job_key]
+        timings.card_latencies.append(latency)
+        if html is None:
+            timings.card_timeouts += 1
+            continue
+        dump_debug_text(f"detail_pages/{job_key}.html", html)
+        job = extract_job_data(html, job_id=None, location=location, apply_link=detail_url(job_key, base_url))
+        job["job_key"] = job_key
+        yield job
@@ -0,0 +1,224 @@
+import asyncio
+import html as html_lib
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .browser_pool import CloudflareSession
+from .detail_cache import detail_cache, snippet_hash
+from .detail_fetcher import INDEED_BASE_URL, detail_url
+from .indeed import DETAIL_CONCURRENCY, MAX_JOBS, MAX_PAGES, RESULTS_PER_PAGE, extract_job_data, search_url
+from .waits import ScrapeTimings
+from app.utils.metrics import observe_span
+
+# The result cards are embedded as JSON in a script on the results page
+MOSAIC_MARKER = 'window.mosaic.providerData["mosaic-provider-jobcards"]'
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+class PageShapeError(Exception):
+    """Raised when a results page doesn't carry the expected embedded JSON."""
+
+
+class CloudflareBlocked(Exception):
+    """Raised when Indeed answers with a Cloudflare challenge instead of content."""
+
+
+def strip_tags(text: str) -> str:
+    return " ".join(html_lib.unescape(TAG_RE.sub(" ", text or "")).split())
+
+
+def is_challenge(response: httpx.Response) -> bool:
+    return response.status_code in (403, 503) and "Just a moment" in response.text
+
+
+def parse_search_results(page_html: str) -> Optional[List[Dict[str, Any]]]:
+    """Job cards from the results page's embedded JSON, or None if it isn't there."""
+    start = page_html.find(MOSAIC_MARKER)
+    if start == -1:
+        return None
+    start = page_html.find("{", start)
+    try:
+        data, _ = json.JSONDecoder().raw_decode(page_html, start)
+        results = data["metaData"]["mosaicProviderJobCardsModel"]["results"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return results if isinstance(results, list) else None
+
+
+def card_salary(card: Dict[str, Any]) -> str:
+    snippet = card.get("salarySnippet") or {}
+    if snippet.get("text"):
+        return snippet["text"]
+    extracted = card.get("extractedSalary") or {}
+    if extracted.get("max"):
+        amount = f"Rs {extracted.get('min') or extracted['max']:,}"
+        if extracted.get("min") and extracted["min"] != extracted["max"]:
+            amount += f" - Rs {extracted['max']:,}"
+        return f"{amount} a {extracted.get('type', 'month')}" if extracted.get("type") else amount
+    return "Not specified"
+
+
+def card_to_job(card: Dict[str, Any], location: str, base_url: str) -> Dict[str, Any]:
+    """Job record from a result card alone (the description is Indeed's snippet)."""
+    description = strip_tags(card.get("snippet", ""))
+    return {
+        "job_id": None,
+        "job_title": card.get("displayTitle") or card.get("title") or "Unknown Title",
+        "company": card.get("company") or "Not specified",
+        "location": card.get("formattedLocation") or location,
+        "salary": card_salary(card),
+        "job_type": ", ".join(card.get("jobTypes") or []) or "Not specified",
+        "experience_required": "Not specified",
+        "job_nature": "On-site" if "in person" in description.lower() else "Not specified",
+        "apply_link": detail_url(card["jobkey"], base_url),
+        "job_description": description,
+        "job_key": card["jobkey"]
+    }
+
+
+def listing_hash(card_job: Dict[str, Any]) -> str:
+    """Snippet hash of a job from its result card fields."""
+    return snippet_hash(" ".join(card_job[field] for field in ("job_title", "company", "location",
+                                                                "salary", "job_description")))
+
+
+def merge_detail(card_job: Dict[str, Any], detail_html: str) -> Dict[str, Any]:
+    """Job record from the detail page, with gaps filled from the result card."""
+    job = extract_job_data(detail_html, job_id=None, location=card_job["location"],
+                           apply_link=card_job["apply_link"])
+    for field, missing in (("job_title", "Unknown Title"), ("company", "Not specified"),
+                           ("salary", "Not specified"), ("job_type", "Not specified")):
+        if job[field] == missing:
+            job[field] = card_job[field]
+    if not job["job_description"]:
+        job["job_description"] = card_job["job_description"]
+    job["job_key"] = card_job["job_key"]
+    return job
+
+
+class IndeedHttpClient:
+    """Pooled async HTTP client carrying the cached Cloudflare cookies.
+
+    One connection pool is shared by all searches; cookies and user agent
+    are swapped whenever a new Cloudflare session is handed in.
+    """
+
+    def __init__(self, max_connections: int = 20, timeout: float = 15.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cf_session: Optional[CloudflareSession] = None
+
+    def client(self, cf_session: CloudflareSession) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True,
+                                             headers={"Accept": "text/html,application/xhtml+xml",
+                                                      "Accept-Language": "en-US,en;q=0.9"})
+        if cf_session is not self._cf_session:
+            self._client.cookies.clear()
+            self._client.cookies.update(cf_session.cookies)
+            self._client.headers["User-Agent"] = cf_session.user_agent
+            self._cf_session = cf_session
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._cf_session = None
+
+
+http_client = IndeedHttpClient()
+
+
+async def _fetch_detail(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, job_key: str,
+                        base_url: str, timings: ScrapeTimings) -> Optional[str]:
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await client.get(detail_url(job_key, base_url))
+            page = response.text if response.status_code == 200 and not is_challenge(response) else None
+        except httpx.HTTPError:
+            page = None
+    latency = time.perf_counter() - started
+    timings.card_latencies.append(latency)
+    observe_span("detail_fetch", latency)
+    if page is None:
+        timings.card_timeouts += 1
+    return page
+
+
+async def aiter_indeed_jobs_http(position: str, location: str, cf_session: CloudflareSession,
+                                 max_jobs: Optional[int] = None, timings: Optional[ScrapeTimings] = None,
+                                 base_url: str = INDEED_BASE_URL) -> AsyncIterator[Dict[str, Any]]:
+    """Yield Indeed jobs using plain HTTP requests, without a browser.
+
+    Result pages are parsed from their embedded job card JSON and detail
+    pages are fetched concurrently. Raises CloudflareBlocked when the cookies
+    are rejected and PageShapeError when a results page isn't recognized.
+    """
+    if timings is None:
+        timings = ScrapeTimings()
+    if not max_jobs:
+        max_jobs = MAX_JOBS
+    client = http_client.client(cf_session)
+    semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+    seen_keys = set()
+    job_count = 0
+
+    for page in range(MAX_PAGES):
+        started = time.perf_counter()
+        response = await client.get(search_url(position, location, start=page * RESULTS_PER_PAGE, base_url=base_url))
+        elapsed = time.perf_counter() - started
+        timings.page_loads.append(elapsed)
+        observe_span("page_load", elapsed)
+        if is_challenge(response):
+            raise CloudflareBlocked(f"Cloudflare challenge on {response.url}")
+
+        cards = parse_search_results(response.text)
+        if cards is None:
+            raise PageShapeError(f"No job card data on {response.url}")
+
+        # Skip jobs already seen on earlier pages (Indeed repeats sponsored posts)
+        cards = [card for card in cards if card.get("jobkey") and card["jobkey"] not in seen_keys]
+        if not cards:
+            return
+        cards = cards[:max_jobs - job_count]
+        seen_keys.update(card["jobkey"] for card in cards)
+
+        card_jobs = [card_to_job(card, location, base_url) for card in cards]
+
+        # Postings unchanged since an earlier crawl reuse their stored details
+        hashes = {job["job_key"]: listing_hash(job) for job in card_jobs}
+        reused = await asyncio.to_thread(detail_cache.lookup, list(hashes.items()))
+        for card_job in card_jobs:
+            if card_job["job_key"] in reused:
+                job = reused[card_job["job_key"]]
+                job["location"] = card_job["location"]
+                timings.details_reused += 1
+                job_count += 1
+                job["job_id"] = job_count
+                yield job
+        card_jobs = [job for job in card_jobs if job["job_key"] not in reused]
+
+        pages = await asyncio.gather(*(_fetch_detail(client, semaphore, job["job_key"], base_url, timings)
+                                       for job in card_jobs))
+        for card_job, detail_html in zip(card_jobs, pages):
+            # Parsing is CPU-bound, keep it off the event loop
+            if detail_html:
+                job = await asyncio.to_thread(merge_detail, card_job, detail_html)
+                await asyncio.to_thread(detail_cache.store, [(job["job_key"], hashes[job["job_key"]], job)])
+            else:
+                job = card_job
+            job_count += 1
+            job["job_id"] = job_count
+            yield job
+
+        if job_count >= max_jobs:
+            return
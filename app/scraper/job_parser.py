@@ -0,0 +1,211 @@
+import os
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+# Faster parsers are optional; bs4 is always available as the fallback
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+TITLE_TESTID = "jobsearch-JobInfoHeader-title"
+COMPANY_SELECTORS = (
+    'div[data-testid="inlineHeader-companyName"] a',
+    'div[data-company-name="true"] a',
+)
+COMPONENT_CLASS = "jobsearch-JobComponent"
+NON_TEXT_TAGS = ("script", "style")
+
+# "auto" picks the fastest installed backend
+PARSER_BACKEND = os.getenv("SCRAPE_HTML_PARSER", "auto")
+
+
+def _empty_detail(description_text: Optional[str]) -> Dict[str, Any]:
+    return {
+        "job_title": "Unknown Title",
+        "company": "Not specified",
+        "salary": "Not specified",
+        "job_type": "Not specified",
+        "experience_required": "Not specified",
+        "description_text": description_text or "",
+    }
+
+
+def _pick_fields(detail: Dict[str, Any], elements: Iterator[Tuple[str, Callable[[], str]]]):
+    """Fill salary, job type and experience in one walk over ``(tag, text)`` pairs.
+
+    Text is computed lazily and the walk stops once all three were found.
+    """
+    salary = job_type = experience = None
+    for tag, text_of in elements:
+        if tag == "p" and (salary is None or job_type is None):
+            text = text_of()
+            if salary is None and ("Rs" in text or "PKR" in text):
+                salary = text
+            if job_type is None and "Job Type" in text:
+                job_type = text
+        elif tag == "li" and experience is None:
+            text = text_of()
+            if "year" in text.lower():
+                experience = text
+        if salary is not None and job_type is not None and experience is not None:
+            break
+
+    if salary is not None:
+        detail["salary"] = salary
+    if job_type is not None:
+        detail["job_type"] = job_type.replace("Job Type:", "").strip()
+    if experience is not None:
+        detail["experience_required"] = experience
+
+
+def _parse_bs4(html: str, description_text: Optional[str]) -> Dict[str, Any]:
+    soup = BeautifulSoup(html, "html.parser")
+    detail = _empty_detail(description_text)
+    if description_text is None:
+        component = soup.select_one(f"div.{COMPONENT_CLASS}") or soup
+        detail["description_text"] = component.get_text("\n", strip=True)
+
+    title = soup.find(attrs={"data-testid": TITLE_TESTID})
+    if title:
+        # Drop the nested "- job post" span
+        suffix = title.find("span", string=lambda text: text and "job post" in text)
+        if suffix:
+            suffix.decompose()
+        detail["job_title"] = title.get_text(strip=True)
+
+    company = None
+    for selector in COMPANY_SELECTORS:
+        company = soup.select_one(selector)
+        if company:
+            break
+    if company:
+        for svg in company.select("svg"):
+            svg.decompose()
+        detail["company"] = company.text.strip()
+
+    _pick_fields(detail, ((el.name, lambda el=el: el.text) for el in soup.find_all(["p", "li"])))
+    return detail
+
+
+def _lxml_strings(element, skip=NON_TEXT_TAGS) -> Iterator[str]:
+    """Text nodes under ``element`` in document order, like bs4's ``strings``."""
+    # Comments and processing instructions have a non-string tag
+    if not isinstance(element.tag, str) or element.tag in skip:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _lxml_strings(child, skip)
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_first(root, xpath):
+    found = root.xpath(xpath)
+    return found[0] if found else None
+
+
+def _parse_lxml(html: str, description_text: Optional[str]) -> Dict[str, Any]:
+    root = lxml.html.fromstring(html)
+    detail = _empty_detail(description_text)
+    if description_text is None:
+        component = _lxml_first(
+            root, f"//div[contains(concat(' ', normalize-space(@class), ' '), ' {COMPONENT_CLASS} ')]"
+        )
+        if component is None:
+            component = root.getroottree().getroot()
+        detail["description_text"] = "\n".join(
+            text.strip() for text in _lxml_strings(component) if text.strip()
+        )
+
+    title = _lxml_first(root, f'//*[@data-testid="{TITLE_TESTID}"]')
+    if title is not None:
+        for span in title.iter("span"):
+            if len(span) == 0 and span.text and "job post" in span.text:
+                span.drop_tree()
+                break
+        detail["job_title"] = "".join(text.strip() for text in _lxml_strings(title))
+
+    company = _lxml_first(root, '//div[@data-testid="inlineHeader-companyName"]//a')
+    if company is None:
+        company = _lxml_first(root, '//div[@data-company-name="true"]//a')
+    if company is not None:
+        detail["company"] = "".join(_lxml_strings(company, NON_TEXT_TAGS + ("svg",))).strip()
+
+    _pick_fields(detail, ((el.tag, lambda el=el: "".join(_lxml_strings(el)))
+                          for el in root.iter("p", "li")))
+    return detail
+
+
+def _parse_selectolax(html: str, description_text: Optional[str]) -> Dict[str, Any]:
+    tree = HTMLParser(html)
+    tree.strip_tags(list(NON_TEXT_TAGS))
+    detail = _empty_detail(description_text)
+    if description_text is None:
+        component = tree.css_first(f"div.{COMPONENT_CLASS}") or tree.root
+        text = component.text(deep=True, separator="\n", strip=True) if component else ""
+        detail["description_text"] = "\n".join(line for line in text.split("\n") if line)
+
+    title = tree.css_first(f'[data-testid="{TITLE_TESTID}"]')
+    if title is not None:
+        for span in title.css("span"):
+            if next(span.iter(), None) is None and "job post" in span.text():
+                span.decompose()
+                break
+        detail["job_title"] = title.text(deep=True, separator="", strip=True)
+
+    company = None
+    for selector in COMPANY_SELECTORS:
+        company = tree.css_first(selector)
+        if company is not None:
+            break
+    if company is not None:
+        for svg in company.css("svg"):
+            svg.decompose()
+        detail["company"] = company.text(deep=True).strip()
+
+    _pick_fields(detail, ((el.tag, lambda el=el: el.text(deep=True)) for el in tree.css("p, li")))
+    return detail
+
+
+BACKENDS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+
+def available_backends():
+    """Installed backends, fastest first."""
+    installed = {"selectolax": HTMLParser is not None, "lxml": lxml is not None, "bs4": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """The backend to use for ``name``, falling back to bs4 when it isn't installed."""
+    name = (name or PARSER_BACKEND).lower()
+    installed = available_backends()
+    if name == "auto":
+        return installed[0]
+    return name if name in installed else "bs4"
+
+
+def parse_job_detail(html: str, description_text: Optional[str] = None,
+                     backend: Optional[str] = None) -> Dict[str, Any]:
+    """Extract the fields of a job description pane or detail page.
+
+    Returns job_title, company, salary, job_type, experience_required and
+    description_text. ``description_text`` is taken from the page when not
+    given. ``backend`` is "selectolax", "lxml", "bs4" or "auto", defaulting to
+    the SCRAPE_HTML_PARSER variable.
+    """
+    if not html or not html.strip():
+        return _empty_detail(description_text)
+    return BACKENDS[resolve_backend(backend)](html, description_text)
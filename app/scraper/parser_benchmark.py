@@ -0,0 +1,60 @@
+"""Compare the job detail parser backends on a corpus of saved detail pages.
+
+Pages are saved under ``$DEBUG_DUMP_DIR/detail_pages`` while scraping with
+DEBUG_DUMP_DIR set. Run with::
+
+    python -m app.scraper.parser_benchmark [corpus_dir] [--repeat N]
+"""
+import argparse
+import glob
+import os
+import time
+
+from .job_parser import available_backends, parse_job_detail
+
+
+def load_corpus(corpus_dir):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def benchmark(pages, backend, repeat):
+    """Best-of-``repeat`` seconds to parse every page once, and the parsed details."""
+    best = None
+    details = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        details = [parse_job_detail(html, backend=backend) for _, html in pages]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, details
+
+
+def main():
+    default_dir = os.path.join(os.getenv("DEBUG_DUMP_DIR", "debug"), "detail_pages")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus_dir", nargs="?", default=default_dir)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        raise SystemExit(f"No .html files in {args.corpus_dir}")
+
+    print(f"{len(pages)} pages, {sum(len(html) for _, html in pages) / 1024:.0f} KiB, best of {args.repeat}")
+    baseline_seconds, baseline = benchmark(pages, "bs4", args.repeat)
+    for backend in available_backends():
+        seconds, details = benchmark(pages, backend, args.repeat)
+        # Pages whose fields differ from the bs4 reference
+        mismatches = [name for (name, _), a, b in zip(pages, details, baseline) if a != b]
+        print(f"{backend:>10}: {seconds * 1000 / len(pages):7.2f} ms/page  "
+              f"{baseline_seconds / seconds:5.1f}x vs bs4  {len(mismatches)} mismatches")
+        for name in mismatches[:5]:
+            print(f"{'':>12}{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from typing import Any, Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+JOB_PANE_SELECTOR = "div.jobsearch-JobComponent"
+JOB_PANE_TITLE_SELECTOR = '[data-testid="jobsearch-JobInfoHeader-title"]'
+
+
+class AdaptiveTimeout:
+    """Timeout that follows observed latencies instead of a fixed sleep.
+
+    Keeps an exponentially weighted moving average of recent waits and allows
+    ``multiplier`` times that (plus ``margin``), clamped to [minimum, maximum].
+    """
+
+    def __init__(self, initial: float = 5.0, minimum: float = 1.0, maximum: float = 10.0,
+                 multiplier: float = 3.0, margin: float = 0.5, alpha: float = 0.3):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.margin = margin
+        self.alpha = alpha
+        self.average: Optional[float] = None
+        self.initial = initial
+
+    @property
+    def value(self) -> float:
+        if self.average is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, self.average * self.multiplier + self.margin))
+
+    def observe(self, latency: float):
+        if self.average is None:
+            self.average = latency
+        else:
+            self.average = self.alpha * latency + (1 - self.alpha) * self.average
+
+
+class ScrapeTimings:
+    """Per-search latency instrumentation for the scraper."""
+
+    # The scraper used to sleep this long after each card click
+    FIXED_SLEEP_PER_CARD = 3.0
+
+    def __init__(self):
+        self.page_loads: List[float] = []
+        self.card_latencies: List[float] = []
+        self.card_timeouts = 0
+        # Jobs whose stored detail record was reused instead of fetched again
+        self.details_reused = 0
+
+    def summary(self) -> Dict[str, Any]:
+        cards = len(self.card_latencies)
+        total = sum(self.card_latencies)
+        return {
+            "pages": len(self.page_loads),
+            "page_load_seconds": round(sum(self.page_loads), 3),
+            "cards": cards,
+            "card_timeouts": self.card_timeouts,
+            "details_reused": self.details_reused,
+            "avg_card_seconds": round(total / cards, 3) if cards else 0.0,
+            "max_card_seconds": round(max(self.card_latencies), 3) if cards else 0.0,
+            "saved_vs_fixed_sleep_seconds": round(cards * self.FIXED_SLEEP_PER_CARD - total, 3)
+        }
+
+
+def wait_for_document_ready(driver, timeout: float = 10) -> bool:
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except Exception:
+        return False
+
+
+def job_pane_signature(driver) -> str:
+    """Identify what the description pane currently shows ("" if nothing)."""
+    try:
+        panes = driver.find_elements(By.CSS_SELECTOR, JOB_PANE_SELECTOR)
+        if not panes:
+            return ""
+        titles = panes[0].find_elements(By.CSS_SELECTOR, JOB_PANE_TITLE_SELECTOR)
+        if not titles:
+            return ""
+        return f"{titles[0].text}|{panes[0].text[:200]}"
+    except Exception:
+        return ""
+
+
+def pane_shows_job(driver, job_key: Optional[str]) -> bool:
+    """Whether the description pane already shows ``job_key`` (e.g. the first result before any click)."""
+    try:
+        return bool(job_key) and f"vjk={job_key}" in driver.current_url and bool(job_pane_signature(driver))
+    except Exception:
+        return False
+
+
+def wait_for_job_pane(driver, previous_signature: str, job_key: Optional[str],
+                      timeout: float) -> Optional[str]:
+    """Wait until the description pane switches to a different job.
+
+    When the clicked card's ``job_key`` is known the URL must carry it as
+    ``vjk=``; otherwise any change of the pane signature counts. Returns the new
+    signature, or None on timeout. Check ``pane_shows_job`` first for a card
+    that is already shown, as its pane never changes.
+    """
+    def pane_changed(d):
+        if job_key and f"vjk={job_key}" not in d.current_url:
+            return False
+        signature = job_pane_signature(d)
+        if signature and signature != previous_signature:
+            return signature
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(pane_changed)
+    except Exception:
+        return None
@@ -0,0 +1,172 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Set
+
+
+class StageOverloaded(Exception):
+    """Raised when a stage's wait queue is full."""
+
+
+class StagePool:
+    """Bounded worker pool for one blocking pipeline stage (scraping, LLM calls).
+
+    Blocking work is run off the event loop in a thread pool; async work runs on
+    the loop. At most ``max_workers`` calls run at once; further calls wait in a
+    queue, which can be capped with ``max_queue`` (0 means unbounded).
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_queue: int = 0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._detached: Set[asyncio.Future] = set()
+
+        # Metrics
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=f"{self.name}-worker")
+        return self._executor
+
+    def is_saturated(self) -> bool:
+        return 0 < self.max_queue <= self.queued
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run blocking ``fn(*args)`` in the pool and await its result.
+
+        Workers run in a copy of the caller's context, so context variables
+        (e.g. the search's span log) carry over.
+        """
+        loop = asyncio.get_running_loop()
+        fn = functools.partial(contextvars.copy_context().run, fn)
+        return await self._limited(lambda: loop.run_in_executor(self.executor, fn, *args))
+
+    async def run_async(self, coro_fn: Callable[..., Awaitable], *args: Any) -> Any:
+        """Await ``coro_fn(*args)`` on the event loop under the same concurrency limit."""
+        return await self._limited(lambda: coro_fn(*args))
+
+    async def iterate(self, gen_fn: Callable[..., Iterator], *args: Any) -> AsyncIterator:
+        """Run blocking generator ``gen_fn(*args)`` in the pool, yielding its items as they come.
+
+        Closing the async iterator early (or cancelling its consumer) stops the
+        generator after its current item.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def produce():
+            generator = gen_fn(*args)
+            try:
+                for item in generator:
+                    loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (finished, e))
+                return
+            finally:
+                generator.close()
+            loop.call_soon_threadsafe(queue.put_nowait, (finished, None))
+
+        def on_done(future):
+            # Covers failures before produce() ran, e.g. StageOverloaded
+            if not future.cancelled() and future.exception() is not None:
+                queue.put_nowait((finished, future.exception()))
+
+        producer = asyncio.ensure_future(self.run(produce))
+        producer.add_done_callback(on_done)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is finished:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stop.set()
+            # Don't wait for the worker: it stops after its current item and
+            # frees its pool slot then, so timeouts on the consumer stay prompt
+            if not producer.done():
+                self._detached.add(producer)
+                producer.add_done_callback(self._detached.discard)
+
+    async def _limited(self, start: Callable[[], Awaitable]) -> Any:
+        if self.is_saturated():
+            self.rejected += 1
+            raise StageOverloaded(f"Too many pending {self.name} tasks, please try again later")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        self.total_wait_time += started_at - queued_at
+        self.running += 1
+        try:
+            result = await start()
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.total_run_time += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait_time / finished, 3) if finished else 0.0,
+            "avg_run_seconds": round(self.total_run_time / finished, 3) if finished else 0.0
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Scrape workers share one browser pool and Cloudflare session
+scrape_pool = StagePool(
+    "scrape",
+    max_workers=int(os.getenv("SCRAPE_WORKERS", "2")),
+    max_queue=int(os.getenv("SCRAPE_MAX_QUEUE", "50"))
+)
+
+llm_pool = StagePool(
+    "llm",
+    max_workers=int(os.getenv("LLM_WORKERS", "4")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "100"))
+)
@@ -0,0 +1,64 @@
+import asyncio
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.scraper.waits import ScrapeTimings
+from app.services.sources import JobSource, SearchQuery
+
+NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def normalize_field(text: Optional[str]) -> str:
+    return " ".join(NON_WORD_RE.sub(" ", (text or "").lower()).split())
+
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """Identity of a job across sources: normalized title, company and location."""
+    return "|".join(normalize_field(job.get(field)) for field in ("job_title", "company", "location"))
+
+
+async def fan_out(query: SearchQuery, sources: Sequence[JobSource],
+                  on_job: Optional[Callable[[Dict[str, Any]], None]] = None
+                  ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Search all ``sources`` concurrently and merge their jobs.
+
+    Jobs are deduplicated by ``job_fingerprint`` in arrival order, tagged with
+    their ``source`` and passed to ``on_job`` as they come. A source that
+    exceeds its timeout or fails keeps the jobs it produced so far. Returns the
+    merged jobs and per-source stats.
+    """
+    jobs: List[Dict[str, Any]] = []
+    seen = set()
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    async def consume(source: JobSource):
+        timings = ScrapeTimings()
+        source_stats = stats[source.name] = {"status": "ok", "jobs": 0, "duplicates": 0}
+        started = time.perf_counter()
+
+        async def collect():
+            async for job in source.search(query, timings):
+                fingerprint = job_fingerprint(job)
+                if fingerprint in seen:
+                    source_stats["duplicates"] += 1
+                    continue
+                seen.add(fingerprint)
+                job["source"] = source.name
+                jobs.append(job)
+                source_stats["jobs"] += 1
+                if on_job is not None:
+                    on_job(job)
+
+        try:
+            await asyncio.wait_for(collect(), timeout=source.timeout)
+        except asyncio.TimeoutError:
+            source_stats["status"] = "timeout"
+        except Exception as e:
+            source_stats["status"] = "error"
+            source_stats["error"] = str(e)
+        source_stats["seconds"] = round(time.perf_counter() - started, 3)
+        source_stats.update(timings.summary())
+
+    await asyncio.gather(*(consume(source) for source in sources))
+    return jobs, stats
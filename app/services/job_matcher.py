@@ -1,25 +1,132 @@
+import argparse
+import asyncio
 import os
 import json
-import google.generativeai as genai
 from dotenv import load_dotenv
-import re
+from pydantic import ValidationError
+from app.models import LLMMatch, MatchedJob
+from app.services.llm_client import GeminiClient, JSONArrayStream, LLMError
+from app.services.ranking import rank_jobs
+from app.services import semantic_index as semantic
+from app.utils.metrics import span
+
 # Load environment variables
+load_dotenv()
+
+# Only the best locally ranked jobs are sent to Gemini
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "10"))
+# Descriptions are cut to this many characters in the prompt
+MAX_DESCRIPTION_CHARS = int(os.getenv("MAX_DESCRIPTION_CHARS", "1500"))
+# With a budget set, every filtered job is scored in prompts of about this many tokens
+# each instead of sending only the MATCH_TOP_K best (0 disables batching)
+LLM_BATCH_TOKENS = int(os.getenv("LLM_BATCH_TOKENS", "0"))
+# Maximum number of batch prompts in flight per search
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "3"))
+# Forward matches to the caller while Gemini is still generating
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"
+# "gemini" (default) or "local" to match offline with the semantic index only
+MATCH_MODE = os.getenv("MATCH_MODE", "gemini")
+
+# Structured output: Gemini answers with ids, scores and rationales only
+MATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "match_score": {"type": "INTEGER"},
+            "rationale": {"type": "STRING"}
+        },
+        "required": ["id", "match_score"]
+    }
+}
+GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": MATCH_RESPONSE_SCHEMA
+}
+
+# One long-lived client shared by all searches
+gemini_client = GeminiClient(
+    model_name=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
+    timeout=float(os.getenv("LLM_TIMEOUT", "30")),
+    budget=float(os.getenv("LLM_LATENCY_BUDGET", "60")),
+    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+)
 
 def load_json(file_path):
     """Load a JSON file."""
     with open(file_path, "r", encoding="utf-8") as file:
         return json.load(file)
 
-def match_jobs_with_gemini():
-    load_dotenv()
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    # Load user input and scraped jobs
-    user_input = load_json("user_input.json")
-    scraped_jobs = load_json("scraped_jobs.json")
+def to_match_result(job, match_score=None, rationale=""):
+    """Shape a scraped job as a match result (see MatchedJob)."""
+    return MatchedJob.from_job(job, match_score, rationale).dict()
+
+def local_matches(user_input, scraped_jobs, top_k=None):
+    """Match results from the local semantic index (BM25 without NumPy), without calling Gemini."""
+    if semantic.available():
+        ranked_jobs = semantic.semantic_index.rank(user_input, scraped_jobs, top_k or MATCH_TOP_K)
+        return [to_match_result(job, rationale="Matched locally by similarity to your position and skills")
+                for job in ranked_jobs]
+    ranked_jobs = rank_jobs(user_input, scraped_jobs, top_k or MATCH_TOP_K)
+    return [to_match_result(job, rationale="Ranked locally") for job in ranked_jobs]
+
+def is_offline(offline=None):
+    """Whether to skip Gemini: explicitly, by MATCH_MODE=local, or for lack of an API key."""
+    if offline is None:
+        offline = MATCH_MODE == "local"
+    return offline or not gemini_client.is_configured()
+
+# Only these fields are sent to Gemini
+PROMPT_FIELDS = ("job_title", "company", "location", "salary", "job_type", "experience_required",
+                 "job_nature", "job_description")
+
+def prompt_job(job, ref=None):
+    """Compact copy of a job for the prompt, with a truncated description."""
+    prompt_data = {"id": ref} if ref is not None else {}
+    prompt_data.update((field, job[field]) for field in PROMPT_FIELDS if job.get(field))
+    description = prompt_data.get("job_description", "")
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        prompt_data["job_description"] = description[:MAX_DESCRIPTION_CHARS] + "..."
+    return prompt_data
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)."""
+    return len(text) // 4 + 1
 
+def job_tokens(job):
+    return estimate_tokens(json.dumps(prompt_job(job), ensure_ascii=False, separators=(",", ":")))
+
+def make_batches(jobs, token_budget):
+    """Split jobs, in order, into batches whose estimated size stays within the budget.
+
+    A job larger than the budget on its own still gets a batch of its own.
+    """
+    batches = []
+    batch, batch_tokens = [], 0
+    for job in jobs:
+        tokens = job_tokens(job)
+        if batch and batch_tokens + tokens > token_budget:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(job)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def merge_rankings(batch_matches):
+    """Merge per-batch match lists into one list ordered by match_score.
+
+    Ties keep their batch order, which follows the local ranking.
+    """
+    merged = [match for matches in batch_matches for match in matches]
+    return sorted(merged, key=lambda match: match["match_score"], reverse=True)
+
+def build_prompt(user_input, ranked_jobs):
     # Construct the prompt
     prompt = """
-    I have the following list of job postings. Each job posting contains multiple fields like job title, company name, location, description, salary, etc. 
+    I have the following list of job postings. Each job posting has an "id" and fields like job title, company name, location, description, salary, etc.
 
     User is looking for jobs that match the following preferences:
     Position: {position}
@@ -29,50 +136,170 @@ def match_jobs_with_gemini():
     Location: {location}
     Skills: {skills}
 
-    Please find the best matching jobs based on the above user preferences. Return the result in a structured JSON format with the following fields for each matching job:
-    - job_title
-    - company_name
-    - location
-    - description
-    - salary
-    - job_type (e.g., full-time, part-time, contract)
-    - experience_required
-    - skills_required
-    - apply_link
+    Please find the best matching jobs based on the above user preferences. For each matching job return only:
+    - id (the job's id from the list below)
+    - match_score (0-100, how well the job matches the preferences)
+    - rationale (one short sentence explaining the score)
 
-    Here is the list of job postings (each job includes its full details):
+    Here is the list of job postings:
 
     {scraped_jobs}
 
-    Match the jobs based on the user input and return the best matches.
+    Return a JSON array with the best matches first. Do not repeat the job details.
     """
 
     # Format the prompt with user input and job details
-    formatted_prompt = prompt.format(
+    return prompt.format(
         position=user_input.get("position", ""),
         experience=user_input.get("experience", ""),
         salary=user_input.get("salary", ""),
-        job_nature=user_input.get("job_nature", ""),
+        job_nature=user_input.get("jobNature", user_input.get("job_nature", "")),
         location=user_input.get("location", ""),
         skills=user_input.get("skills", ""),
-        scraped_jobs=json.dumps(scraped_jobs, indent=4)
+        scraped_jobs=json.dumps([prompt_job(job, ref) for ref, job in enumerate(ranked_jobs, 1)],
+                                ensure_ascii=False, separators=(",", ":"))
     )
 
-    # Initialize Gemini API with API key
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+def join_match(item, ranked_jobs, seen_refs):
+    """Validate one structured LLM item and join it to its scraped job.
 
+    Returns None for invalid items, unknown ids and repeated ids.
+    """
     try:
-        # Send the request to the Gemini API
-        response = model.generate_content(formatted_prompt)
+        match = LLMMatch.parse_obj(item)
+    except ValidationError:
+        return None
+    if not 1 <= match.id <= len(ranked_jobs) or match.id in seen_refs:
+        return None
+    seen_refs.add(match.id)
+    return to_match_result(ranked_jobs[match.id - 1], match.match_score, match.rationale)
+
+def parse_matches(response_text, ranked_jobs):
+    """Parse a complete structured response into match results."""
+    with span("json_parse"):
+        try:
+            items = json.loads(response_text)
+        except ValueError as e:
+            raise LLMError(f"Could not parse Gemini response: {e}") from e
+        if not isinstance(items, list):
+            raise LLMError("Gemini response is not a JSON array")
+
+        seen_refs = set()
+        matches = [join_match(item, ranked_jobs, seen_refs) for item in items]
+        return [match for match in matches if match is not None]
+
+def match_jobs(user_input, scraped_jobs, top_k=None, offline=None):
+    """Match in-memory scraped jobs against the user's preferences (blocking).
+
+    Jobs are first filtered and ranked locally and only the ``top_k`` best
+    (MATCH_TOP_K by default) are sent to Gemini. Offline (see ``is_offline``)
+    the local matches are returned directly. Returns a list of match results.
+    Raises LLMError when Gemini fails.
+    """
+    if is_offline(offline):
+        return local_matches(user_input, scraped_jobs, top_k)
+    ranked_jobs = rank_jobs(user_input, scraped_jobs, top_k or MATCH_TOP_K)
+    if not ranked_jobs:
+        return local_matches(user_input, scraped_jobs, top_k)
+
+    response_text = gemini_client.generate_sync(build_prompt(user_input, ranked_jobs),
+                                                generation_config=GENERATION_CONFIG)
+    return parse_matches(response_text, ranked_jobs)
+
+async def match_jobs_async(user_input, scraped_jobs, on_match=None, top_k=None, offline=None):
+    """Match jobs with the shared async Gemini client and return the match results.
+
+    Gemini returns only job ids, scores and rationales (JSON mode with a
+    response schema); they are validated and joined back to the scraped
+    jobs here. With LLM_STREAMING enabled (the default) ``on_match`` is called
+    with each match as soon as the model has produced it. With LLM_BATCH_TOKENS
+    set, all filtered jobs are scored, in concurrent batches if they don't fit
+    one prompt; batches are not streamed, ``on_match`` gets each batch's
+    matches when it completes. Raises LLMError when Gemini fails or a streamed
+    response is incomplete or has no valid matches.
+    """
+    if is_offline(offline):
+        ranked_jobs = []
+    elif LLM_BATCH_TOKENS > 0:
+        ranked_jobs = rank_jobs(user_input, scraped_jobs)
+    else:
+        ranked_jobs = rank_jobs(user_input, scraped_jobs, top_k or MATCH_TOP_K)
+    if not ranked_jobs:
+        # Embedding the jobs is CPU-bound, keep it off the event loop
+        matches = await asyncio.to_thread(local_matches, user_input, scraped_jobs, top_k)
+        if on_match is not None:
+            for match in matches:
+                on_match(match)
+        return matches
+
+    if LLM_BATCH_TOKENS > 0:
+        batches = make_batches(ranked_jobs, LLM_BATCH_TOKENS)
+        if len(batches) > 1:
+            return await match_jobs_chunked(user_input, batches, on_match)
+
+    prompt = build_prompt(user_input, ranked_jobs)
+    if not LLM_STREAMING:
+        matches = parse_matches(await gemini_client.generate(prompt, generation_config=GENERATION_CONFIG),
+                                ranked_jobs)
+        if on_match is not None:
+            for match in matches:
+                on_match(match)
+        return matches
+
+    matches = []
+    seen_refs = set()
+    stream = JSONArrayStream()
+    async for chunk in gemini_client.stream(prompt, generation_config=GENERATION_CONFIG):
+        with span("json_parse"):
+            chunk_matches = [match for match in (join_match(item, ranked_jobs, seen_refs)
+                                                 for item in stream.feed(chunk)) if match is not None]
+        for match in chunk_matches:
+            matches.append(match)
+            if on_match is not None:
+                on_match(match)
+
+    # Not JSON, truncated or cut short by a safety block
+    if not stream.closed:
+        raise LLMError("Gemini response ended before the match array was complete")
+    if not matches:
+        raise LLMError("Gemini response has no valid matches")
+    return matches
+
+async def match_jobs_chunked(user_input, batches, on_match=None, concurrency=None):
+    """Score job batches concurrently and merge them into one ranking.
+
+    At most ``concurrency`` (LLM_BATCH_CONCURRENCY) prompts run at once.
+    ``on_match`` receives each batch's matches as soon as that batch is done.
+    Batches that fail are skipped; LLMError is raised only if all of them fail.
+    """
+    semaphore = asyncio.Semaphore(concurrency or LLM_BATCH_CONCURRENCY)
+
+    async def score_batch(batch):
+        async with semaphore:
+            response_text = await gemini_client.generate(build_prompt(user_input, batch),
+                                                         generation_config=GENERATION_CONFIG)
+        matches = parse_matches(response_text, batch)
+        if on_match is not None:
+            for match in matches:
+                on_match(match)
+        return matches
+
+    results = await asyncio.gather(*[score_batch(batch) for batch in batches], return_exceptions=True)
+    batch_matches = [result for result in results if not isinstance(result, BaseException)]
+    if not batch_matches:
+        raise next(result for result in results if isinstance(result, BaseException))
+    return merge_rankings(batch_matches)
 
-        # Parse the JSON response
-        formatted_json = re.sub(r'```json|```', '', response.text)
-        return formatted_json
-    
-    except Exception as e:
-        # Return error information
-        return json.dumps({"error": str(e)})
+def match_jobs_with_gemini(user_input_path="user_input.json", scraped_jobs_path="scraped_jobs.json", offline=None):
+    """Match jobs from JSON files on disk (debug dumps). ``offline`` matches without Gemini."""
+    return match_jobs(load_json(user_input_path), load_json(scraped_jobs_path), offline=offline)
 
 if __name__ == "__main__":
-    match_jobs_with_gemini()
+    # e.g. python -m app.services.job_matcher debug/user_input_<id>.json debug/scraped_jobs_<id>.json
+    parser = argparse.ArgumentParser(description="Match a search's debug dumps against each other.")
+    parser.add_argument("user_input", nargs="?", default="user_input.json")
+    parser.add_argument("scraped_jobs", nargs="?", default="scraped_jobs.json")
+    parser.add_argument("--offline", action="store_true", help="match locally, without Gemini")
+    args = parser.parse_args()
+    print(json.dumps(match_jobs_with_gemini(args.user_input, args.scraped_jobs, offline=args.offline or None),
+                     ensure_ascii=False, indent=4))
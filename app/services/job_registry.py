@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.utils.metrics import SpanLog
+
+# Event types that end a search's event stream
+FINAL_EVENTS = ("done", "search_error")
+# Response headers for a Server-Sent Events stream (no proxy buffering)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(record: Dict[str, Any]) -> str:
+    return f"id: {record['id']}\nevent: {record['event']}\ndata: {json.dumps(record['data'], ensure_ascii=False)}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """The Last-Event-ID header browsers resend when reconnecting, -1 if absent or invalid."""
+    try:
+        return int(value if value is not None else "-1")
+    except ValueError:
+        return -1
+
+
+# Job scraping status tracking (one instance per search)
+class ScrapingStatus:
+    def __init__(self, search_id: str = ""):
+        self.search_id = search_id
+        self.is_scraping = False
+        self.total_jobs = 0
+        self.scraped_jobs = 0
+        self.current_step = "Not started"
+        self.progress = 0
+        self.result = []
+        self.message = ""
+        self.error = None
+        self.timings: Dict[str, Any] = {}
+        # Per-stage durations (browser start, page load, LLM call, ...)
+        self.spans = SpanLog()
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        # Event stream for Server-Sent Events subscribers
+        self.events: List[Dict[str, Any]] = []
+        self._subscribers: List[asyncio.Queue] = []
+        self._events_lock = threading.Lock()
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    def finish(self):
+        self.is_scraping = False
+        self.finished_at = time.time()
+        if self.error:
+            self.publish("search_error", self.to_dict())
+        else:
+            self.publish("done", self.to_dict())
+
+    def update(self, current_step: Optional[str] = None, progress: Optional[int] = None,
+               message: Optional[str] = None):
+        """Change the progress fields and notify subscribers."""
+        if current_step is not None:
+            self.current_step = current_step
+        if progress is not None:
+            self.progress = progress
+        if message is not None:
+            self.message = message
+        self.publish("progress", self.to_dict())
+
+    def publish(self, event: str, data: Any):
+        """Record an event and push it to subscribers. Safe to call from worker threads."""
+        with self._events_lock:
+            record = {"id": len(self.events), "event": event, "data": data}
+            self.events.append(record)
+            for queue in self._subscribers:
+                self._deliver(queue, record)
+
+    def _deliver(self, queue: asyncio.Queue, record: Dict[str, Any]):
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop or self._loop is None:
+            queue.put_nowait(record)
+        else:
+            self._loop.call_soon_threadsafe(queue.put_nowait, record)
+
+    async def subscribe(self, last_event_id: int = -1,
+                        keepalive: float = 15) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events after ``last_event_id``, then live ones until the search ends.
+
+        Yields None every ``keepalive`` seconds without events.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._events_lock:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+            backlog = self.events[last_event_id + 1:]
+            self._subscribers.append(queue)
+        try:
+            for record in backlog:
+                yield record
+                if record["event"] in FINAL_EVENTS:
+                    return
+            while True:
+                try:
+                    record = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield record
+                if record["event"] in FINAL_EVENTS:
+                    return
+        finally:
+            with self._events_lock:
+                self._subscribers.remove(queue)
+
+    async def sse_stream(self, last_event_id: int = -1) -> AsyncIterator[str]:
+        """``subscribe`` formatted as a Server-Sent Events body, with keepalive comments."""
+        async for record in self.subscribe(last_event_id):
+            if record is None:
+                yield ": keepalive\n\n"
+            else:
+                yield format_sse(record)
+
+    def results_since(self, cursor: int) -> Dict[str, Any]:
+        """The jobs and matches published since ``cursor``, for polling clients.
+
+        After a ``matches_reset`` event only the matches that follow it are
+        returned, with ``matches_reset`` set so the client drops earlier ones.
+        """
+        cursor = max(cursor, 0)
+        records = self.events[cursor:]
+        resets = [i for i, record in enumerate(records) if record["event"] == "matches_reset"]
+        matches_from = resets[-1] + 1 if resets else 0
+        return {
+            "jobs": [record["data"] for record in records if record["event"] == "job"],
+            "matches": [record["data"] for record in records[matches_from:] if record["event"] == "match"],
+            "matches_reset": bool(resets),
+            "next_cursor": cursor + len(records),
+            "done": self.is_finished,
+            "status": self.to_dict()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "search_id": self.search_id,
+            "is_scraping": self.is_scraping,
+            "total_jobs": self.total_jobs,
+            "scraped_jobs": self.scraped_jobs,
+            "current_step": self.current_step,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "timings": dict(self.timings, stages=self.spans.summary())
+        }
+
+
+class JobRegistry:
+    """Bounded, thread-safe registry of per-search status objects.
+
+    Finished searches expire after ``ttl`` seconds and, once more than
+    ``max_searches`` are held, the least recently used finished searches
+    are evicted first. Running searches are never evicted.
+    """
+
+    def __init__(self, max_searches: int = 1000, ttl: float = 3600):
+        self.max_searches = max_searches
+        self.ttl = ttl
+        self._searches: "OrderedDict[str, ScrapingStatus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def create(self) -> ScrapingStatus:
+        search_id = uuid.uuid4().hex
+        status = ScrapingStatus(search_id)
+        with self._lock:
+            self._prune()
+            self._make_room()
+            self._searches[search_id] = status
+        return status
+
+    def get(self, search_id: str) -> Optional[ScrapingStatus]:
+        with self._lock:
+            status = self._searches.get(search_id)
+            if status is None:
+                return None
+            if self._is_expired(status, time.time()):
+                del self._searches[search_id]
+                self.evicted += 1
+                return None
+            # Mark as recently used
+            self._searches.move_to_end(search_id)
+            return status
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._prune()
+            running = sum(1 for s in self._searches.values() if not s.is_finished)
+            return {
+                "searches": len(self._searches),
+                "running": running,
+                "finished": len(self._searches) - running,
+                "evicted": self.evicted
+            }
+
+    def _is_expired(self, status: ScrapingStatus, now: float) -> bool:
+        return status.is_finished and now - status.finished_at > self.ttl
+
+    def _prune(self):
+        # Caller must hold the lock
+        now = time.time()
+        for search_id in [k for k, s in self._searches.items() if self._is_expired(s, now)]:
+            del self._searches[search_id]
+            self.evicted += 1
+
+    def _make_room(self):
+        # Caller must hold the lock. LRU eviction of finished searches,
+        # oldest access first
+        if len(self._searches) >= self.max_searches:
+            for search_id in [k for k, s in self._searches.items() if s.is_finished]:
+                if len(self._searches) < self.max_searches:
+                    break
+                del self._searches[search_id]
+                self.evicted += 1
+
+
+job_registry = JobRegistry(
+    max_searches=int(os.getenv("MAX_TRACKED_SEARCHES", "1000")),
+    ttl=float(os.getenv("SEARCH_RESULT_TTL", "3600"))
+)
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.fanout import job_fingerprint
+from app.services.ranking import passes_filters, tokenize
+from app.utils.storage import data_path
+
+# Columns stored for every job, in the order of the jobs table
+JOB_COLUMNS = ("job_key", "source", "job_title", "company", "location", "salary", "job_type",
+               "experience_required", "job_nature", "apply_link", "job_description")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    job_key TEXT, source TEXT, job_title TEXT, company TEXT, location TEXT, salary TEXT,
+    job_type TEXT, experience_required TEXT, job_nature TEXT, apply_link TEXT,
+    job_description TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    job_title, company, job_description,
+    content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, job_title, company, job_description)
+    VALUES (new.id, new.job_title, new.company, new.job_description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company, job_description)
+    VALUES ('delete', old.id, old.job_title, old.company, old.job_description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF job_title, company, job_description ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company, job_description)
+    VALUES ('delete', old.id, old.job_title, old.company, old.job_description);
+    INSERT INTO jobs_fts (rowid, job_title, company, job_description)
+    VALUES (new.id, new.job_title, new.company, new.job_description);
+END;
+"""
+
+# bm25 column weights: title, company, description
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+
+def fts_query(text: str) -> str:
+    """FTS5 query matching every term of ``text`` as a prefix, safe from query syntax."""
+    return " ".join(f'"{token}"*' for token in tokenize(text))
+
+
+class JobStore:
+    """Every scraped job, kept in SQLite with an FTS5 index for local search.
+
+    Jobs are keyed by their cross-source fingerprint; seeing a job again
+    updates its fields and ``last_seen``. Searches only return jobs seen in
+    the last ``fresh_ttl`` seconds. All methods block on SQLite; call them
+    from a worker thread in async code.
+    """
+
+    def __init__(self, db_path: str, fresh_ttl: float = 86400):
+        self.db_path = db_path
+        self.fresh_ttl = fresh_ttl
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # Row count kept up to date by upsert and purge, so stats() doesn't scan the table
+        self._rows = 0
+
+        # Metrics
+        self.stored = 0
+        self.searches = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+            self._rows = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return self._db
+
+    def upsert(self, jobs: List[Dict[str, Any]]) -> int:
+        """Insert or refresh jobs. Returns the number of rows written."""
+        now = time.time()
+        rows = [
+            (job_fingerprint(job), *(job.get(column) for column in JOB_COLUMNS), now, now)
+            for job in jobs
+        ]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in JOB_COLUMNS)
+        fingerprints = list({row[0] for row in rows})
+        with self._lock:
+            # Counted in chunks, SQLite limits the number of bound parameters
+            existing = sum(
+                self.db.execute(
+                    f"SELECT COUNT(*) FROM jobs WHERE fingerprint IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchone()[0]
+                for chunk in (fingerprints[i:i + 500] for i in range(0, len(fingerprints), 500))
+            )
+            self.db.executemany(
+                f"INSERT INTO jobs (fingerprint, {', '.join(JOB_COLUMNS)}, first_seen, last_seen) "
+                f"VALUES ({', '.join('?' * (len(JOB_COLUMNS) + 3))}) "
+                f"ON CONFLICT (fingerprint) DO UPDATE SET {updates}, last_seen = excluded.last_seen",
+                rows
+            )
+            self.db.commit()
+            self._rows += len(fingerprints) - existing
+        self.stored += len(rows)
+        return len(rows)
+
+    def search(self, user_input: Dict[str, Any], limit: int = 20,
+               max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fresh jobs matching the position (and skills) text, best first.
+
+        ``user_input`` has the search form's fields; location narrows the
+        results, and experience, salary and job nature are applied like the
+        local ranking's filters. Each job gets a ``match_score`` (0-100)
+        relative to the best hit.
+        """
+        query = fts_query(user_input.get("position", ""))
+        if not query:
+            return []
+        cutoff = time.time() - (self.fresh_ttl if max_age is None else max_age)
+        location = " ".join(str(user_input.get("location", "")).split())
+
+        sql = (
+            f"SELECT jobs.*, bm25(jobs_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS rank "
+            "FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid "
+            "WHERE jobs_fts MATCH ? AND jobs.last_seen >= ?"
+        )
+        params: List[Any] = [query, cutoff]
+        if location:
+            sql += " AND jobs.location LIKE ?"
+            params.append(f"%{location}%")
+        # Leave room for rows dropped by the filters below
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit * 5)
+
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        self.searches += 1
+
+        jobs = []
+        for row in rows:
+            job = {column: row[column] for column in JOB_COLUMNS}
+            if not passes_filters(user_input, job):
+                continue
+            # bm25 is negative, lower is better
+            job["match_score"] = round(100 * row["rank"] / rows[0]["rank"]) if rows[0]["rank"] else 0
+            jobs.append(job)
+            if len(jobs) >= limit:
+                break
+        return jobs
+
+    def purge_older_than(self, max_age: float) -> int:
+        """Delete jobs not seen for ``max_age`` seconds."""
+        with self._lock:
+            deleted = self.db.execute("DELETE FROM jobs WHERE last_seen < ?", (time.time() - max_age,)).rowcount
+            self.db.commit()
+            self._rows -= deleted
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        if self._db is None:
+            # Opening the store counts its rows, once
+            self.db
+        return {
+            "jobs": self._rows,
+            "stored": self.stored,
+            "searches": self.searches
+        }
+
+
+job_store = JobStore(
+    db_path=data_path("jobs.sqlite3") if os.getenv("JOB_STORE_DISK", "1") == "1" else ":memory:",
+    fresh_ttl=float(os.getenv("JOB_STORE_FRESH_TTL", "86400"))
+)
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+PREFERENCE_FIELDS = ("position", "experience", "salary", "jobNature", "location", "skills")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def match_fingerprint(user_input: Dict[str, Any], jobs: List[Dict[str, Any]]) -> str:
+    """Content address of a matching request: normalized preferences plus job identities.
+
+    Jobs are identified by their key (or title/company) and a hash of their
+    description, so a re-scrape of unchanged postings maps to the same entry.
+    """
+    preferences = {
+        field: " ".join(str(user_input.get(field, "")).lower().split())
+        for field in PREFERENCE_FIELDS
+    }
+    job_ids = [
+        [
+            job.get("job_key") or f"{job.get('job_title', '')}|{job.get('company', '')}",
+            _digest(job.get("job_description", ""))
+        ]
+        for job in jobs
+    ]
+    return _digest(json.dumps({"preferences": preferences, "jobs": job_ids}, sort_keys=True))
+
+
+class LLMCache:
+    """LRU + TTL cache of LLM responses with single-flight request coalescing.
+
+    Concurrent callers asking for the same key while a call is in flight await
+    that call instead of starting their own.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[1] > self.ttl:
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, value: Any):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[Any]],
+                          cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Return the cached value for ``key`` or await ``call()`` exactly once for it."""
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            # Shield so one cancelled waiter doesn't cancel the shared call
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged as never retrieved
+            future.exception()
+            raise
+        else:
+            if cacheable(value):
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "in_flight": len(self._in_flight)
+        }
+
+
+llm_cache = LLMCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "3600"))
+)
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from app.utils.metrics import span
+
+# Errors worth retrying: rate limits, overload and transient server failures
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+
+SEPARATORS_RE = re.compile(r"[\s,]*")
+
+
+class LLMError(Exception):
+    """Raised when the LLM could not produce a usable response."""
+
+
+class GeminiClient:
+    """Long-lived Gemini client with per-call timeouts and a retry budget.
+
+    The model is configured once on first use. Failed calls are retried with
+    exponential backoff as long as another attempt still fits in ``budget``
+    seconds, counted from the first attempt.
+    """
+
+    def __init__(self, model_name: str = "gemini-2.0-flash", api_key: Optional[str] = None,
+                 timeout: float = 30, budget: float = 60, max_attempts: int = 3,
+                 backoff_base: float = 0.5):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._model = None
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key or os.getenv("GEMINI_API_KEY"))
+
+    @property
+    def model(self):
+        if self._model is None:
+            if not self.is_configured():
+                raise LLMError("GEMINI_API_KEY is not set")
+            genai.configure(api_key=self.api_key or os.getenv("GEMINI_API_KEY"))
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _next_delay(self, attempt: int, started_at: float) -> Optional[float]:
+        """Backoff before the next attempt, or None when the budget is spent."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+        remaining = self.budget - (time.monotonic() - started_at) - delay
+        # Only retry if a reasonable share of a full call still fits
+        if remaining < min(self.timeout, self.budget) / 4:
+            return None
+        return delay
+
+    def _call_timeout(self, started_at: float) -> float:
+        return max(0.1, min(self.timeout, self.budget - (time.monotonic() - started_at)))
+
+    async def generate(self, prompt: str, **kwargs: Any) -> str:
+        """Generate a full response, retrying transient failures."""
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            self.calls += 1
+            try:
+                with span("llm_call"):
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt, **kwargs),
+                        timeout=self._call_timeout(started_at)
+                    )
+                return response.text
+            except RETRYABLE_ERRORS as e:
+                delay = self._next_delay(attempt, started_at)
+                if delay is None:
+                    self.errors += 1
+                    raise LLMError(f"Gemini request failed: {e!r}") from e
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+            except LLMError:
+                self.errors += 1
+                raise
+            except Exception as e:
+                self.errors += 1
+                raise LLMError(f"Gemini request failed: {e}") from e
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Yield response text chunks as they arrive.
+
+        Failures before the first chunk are retried like ``generate``; once
+        text has been yielded an error ends the stream with LLMError.
+        """
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            self.calls += 1
+            yielded = False
+            try:
+                with span("llm_call"):
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt, stream=True, **kwargs),
+                        timeout=self._call_timeout(started_at)
+                    )
+                    chunks = response.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(),
+                                                           timeout=self._call_timeout(started_at))
+                        except StopAsyncIteration:
+                            return
+                        if chunk.text:
+                            yielded = True
+                            yield chunk.text
+            except RETRYABLE_ERRORS as e:
+                delay = None if yielded else self._next_delay(attempt, started_at)
+                if delay is None:
+                    self.errors += 1
+                    raise LLMError(f"Gemini stream failed: {e!r}") from e
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+            except LLMError:
+                self.errors += 1
+                raise
+            except Exception as e:
+                self.errors += 1
+                raise LLMError(f"Gemini stream failed: {e}") from e
+
+    def generate_sync(self, prompt: str, **kwargs: Any) -> str:
+        """Blocking single call, for scripts outside the event loop."""
+        try:
+            return self.model.generate_content(prompt, **kwargs).text
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Gemini request failed: {e}") from e
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "errors": self.errors
+        }
+
+
+class JSONArrayStream:
+    """Incrementally extract the elements of a streamed top-level JSON array.
+
+    ``feed`` returns every element completed by the new text, so callers can
+    act on each item before the model has finished the whole array.
+    ``closed`` tells whether the array's closing bracket has been seen.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.closed = False
+        self._position = 0
+        self._in_array = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        items = []
+        while True:
+            if not self._in_array:
+                start = self.text.find("[", self._position)
+                if start == -1:
+                    return items
+                self._in_array = True
+                self._position = start + 1
+
+            # Skip separators between elements
+            match = SEPARATORS_RE.match(self.text, self._position)
+            self._position = match.end()
+            if self._position >= len(self.text):
+                return items
+            if self.text[self._position] == "]":
+                self.closed = True
+                return items
+            try:
+                item, end = self._decoder.raw_decode(self.text, self._position)
+            except json.JSONDecodeError:
+                # Element not complete yet
+                return items
+            items.append(item)
+            self._position = end
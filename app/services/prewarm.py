@@ -0,0 +1,158 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.executor import scrape_pool
+from app.services.scrape_cache import ScrapeCache, cache_key, normalize_query, scrape_cache
+from app.services.sources import SearchQuery
+
+
+class QueryTracker:
+    """How often each search query is asked for, decaying over time.
+
+    Every search adds 1 to its query's score; scores halve every
+    ``half_life`` seconds so the ranking follows what is popular now.
+    """
+
+    def __init__(self, half_life: float = 86400, max_queries: int = 1000):
+        self.half_life = half_life
+        self.max_queries = max_queries
+        self._scores: Dict[SearchQuery, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, position: str, location: str, max_jobs: int = 0):
+        query = SearchQuery(normalize_query(position), normalize_query(location), max_jobs)
+        now = time.time()
+        with self._lock:
+            score, updated_at = self._scores.get(query, (0.0, now))
+            self._scores[query] = (self._decayed(score, updated_at, now) + 1, now)
+            if len(self._scores) > self.max_queries:
+                # Forget the least popular query
+                coldest = min(self._scores, key=lambda q: self._decayed(*self._scores[q], now))
+                del self._scores[coldest]
+
+    def top(self, count: int, min_score: float = 1.0) -> List[Tuple[SearchQuery, float]]:
+        """The ``count`` most popular queries scoring at least ``min_score``, best first."""
+        now = time.time()
+        with self._lock:
+            scored = [(query, self._decayed(score, updated_at, now))
+                      for query, (score, updated_at) in self._scores.items()]
+        scored = [item for item in scored if item[1] >= min_score]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:count]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class Prewarmer:
+    """Periodically re-crawls the most popular queries into the scrape cache.
+
+    Every ``interval`` seconds (randomized by ``jitter``) the top ``top_n``
+    queries whose cache entry is missing or older than ``refresh_at`` of the
+    cache TTL are scraped again with ``crawl``, at most ``concurrency`` at a
+    time, so searches for them are answered from fresh cached jobs. Rounds
+    are skipped while the scrape workers are saturated by user searches.
+    """
+
+    def __init__(self, tracker: QueryTracker, crawl: Callable[[SearchQuery], Awaitable[List[Dict[str, Any]]]],
+                 cache: ScrapeCache = scrape_cache, key: Optional[Callable[[SearchQuery], str]] = None,
+                 top_n: int = 10, interval: float = 600, jitter: float = 0.2, concurrency: int = 1,
+                 min_score: float = 2.0, refresh_at: float = 0.8):
+        self.tracker = tracker
+        self.crawl = crawl
+        self.cache = cache
+        self.key = key or (lambda query: cache_key(*query))
+        self.top_n = top_n
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.min_score = min_score
+        self.refresh_at = refresh_at
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.rounds = 0
+        self.skipped_rounds = 0
+        self.crawls = 0
+        self.failures = 0
+        self.jobs = 0
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def due(self) -> List[SearchQuery]:
+        """Popular queries whose cached jobs are missing or about to go stale."""
+        queries = []
+        for query, _ in self.tracker.top(self.top_n, self.min_score):
+            age = self.cache.age(self.key(query))
+            if age is None or age >= self.cache.ttl * self.refresh_at:
+                queries.append(query)
+        return queries
+
+    async def _warm(self, query: SearchQuery, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            # Spread the crawls out instead of hitting the sites in a burst
+            await asyncio.sleep(random.uniform(0, self.interval * self.jitter / max(self.top_n, 1)))
+            try:
+                jobs = await self.crawl(query)
+            except Exception:
+                self.failures += 1
+                return
+            self.crawls += 1
+            if jobs:
+                await asyncio.to_thread(self.cache.store, self.key(query), jobs)
+                self.jobs += len(jobs)
+
+    async def run_once(self) -> int:
+        """Re-crawl the queries that are due. Returns how many were crawled."""
+        if scrape_pool.is_saturated():
+            self.skipped_rounds += 1
+            return 0
+        self.rounds += 1
+        queries = await asyncio.to_thread(self.due)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._warm(query, semaphore) for query in queries))
+        return len(queries)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self._jittered(self.interval))
+            await self.run_once()
+
+    def start(self):
+        if self._task is None and self.top_n > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._task is not None,
+            "tracked_queries": len(self.tracker),
+            "top_queries": [
+                {"position": query.position, "location": query.location, "score": round(score, 2)}
+                for query, score in self.tracker.top(self.top_n, self.min_score)
+            ],
+            "rounds": self.rounds,
+            "skipped_rounds": self.skipped_rounds,
+            "crawls": self.crawls,
+            "failures": self.failures,
+            "jobs": self.jobs
+        }
+
+
+query_tracker = QueryTracker(half_life=float(os.getenv("PREWARM_HALF_LIFE", "86400")))
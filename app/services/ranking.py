@@ -0,0 +1,141 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+YEARS_RE = re.compile(r"(\d+)\s*\+?\s*(?:(?:-|to)\s*\d+\s*)?(?:years?|yrs?)", re.IGNORECASE)
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+# Job titles are short, so their terms count more than description terms
+TITLE_WEIGHT = 3
+# A job asking for this many more years than the user has is filtered out
+EXPERIENCE_TOLERANCE = 1
+
+JOB_NATURES = ("remote", "hybrid", "on-site")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def parse_years(text: str) -> Optional[int]:
+    """Smallest number of years mentioned as experience ("3+ years", "2-4 yrs")."""
+    if not text:
+        return None
+    values = [int(m) for m in YEARS_RE.findall(text)]
+    if not values:
+        # Plain numbers like "3" in the user's form
+        plain = NUMBER_RE.findall(text)
+        values = [int(float(n.replace(",", ""))) for n in plain[:1]]
+    return min(values) if values else None
+
+
+def parse_salary(text: str) -> Optional[float]:
+    """Largest amount mentioned in a salary string ("Rs 50,000 - Rs 80,000 a month")."""
+    if not text:
+        return None
+    amounts = [float(n.replace(",", "")) for n in NUMBER_RE.findall(text)]
+    return max(amounts) if amounts else None
+
+
+def job_nature_of(job: Dict[str, Any]) -> Optional[str]:
+    nature = str(job.get("job_nature", "")).lower()
+    for value in JOB_NATURES:
+        if value in nature:
+            return value
+    description = str(job.get("job_description", "")).lower()
+    if "remote" in description:
+        return "remote"
+    if "hybrid" in description:
+        return "hybrid"
+    return None
+
+
+def passes_filters(user_input: Dict[str, Any], job: Dict[str, Any]) -> bool:
+    """Drop jobs that clearly contradict the user's preferences.
+
+    Fields that are missing on either side never exclude a job.
+    """
+    user_years = parse_years(str(user_input.get("experience", "")))
+    job_years = parse_years(str(job.get("experience_required", "")))
+    if user_years is not None and job_years is not None and job_years > user_years + EXPERIENCE_TOLERANCE:
+        return False
+
+    expected_salary = parse_salary(str(user_input.get("salary", "")))
+    offered_salary = parse_salary(str(job.get("salary", "")))
+    if expected_salary is not None and offered_salary is not None and offered_salary < expected_salary:
+        return False
+
+    wanted_nature = str(user_input.get("jobNature", user_input.get("job_nature", ""))).lower()
+    job_nature = job_nature_of(job)
+    if wanted_nature in JOB_NATURES and job_nature is not None and job_nature != wanted_nature:
+        return False
+
+    return True
+
+
+def job_tokens(job: Dict[str, Any]) -> List[str]:
+    tokens = tokenize(str(job.get("job_title", job.get("title", "")))) * TITLE_WEIGHT
+    tokens += tokenize(str(job.get("skills_required", "")))
+    tokens += tokenize(str(job.get("job_description", job.get("description", ""))))
+    return tokens
+
+
+def query_tokens(user_input: Dict[str, Any]) -> List[str]:
+    return tokenize(str(user_input.get("position", ""))) + tokenize(str(user_input.get("skills", "")))
+
+
+class BM25:
+    """Okapi BM25 over a small in-memory corpus of token lists."""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(documents)) if documents else 0.0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def score(self, query: List[str], index: int) -> float:
+        counts = self.term_counts[index]
+        length_norm = 1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1)
+        score = 0.0
+        for term in set(query):
+            tf = counts.get(term)
+            if tf:
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return score
+
+
+def rank_jobs(user_input: Dict[str, Any], jobs: List[Dict[str, Any]],
+              top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Filter and rank jobs locally by BM25 relevance to the user's position and skills.
+
+    Returns copies of the best ``top_k`` jobs (all if None), best first, each
+    with a ``match_score`` between 0 and 100.
+    """
+    candidates = [job for job in jobs if passes_filters(user_input, job)]
+    if not candidates:
+        return []
+
+    bm25 = BM25([job_tokens(job) for job in candidates])
+    query = query_tokens(user_input)
+    scores = [bm25.score(query, i) for i in range(len(candidates))]
+    best = max(scores) or 1.0
+
+    order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+    if top_k is not None:
+        order = order[:top_k]
+
+    ranked = []
+    for i in order:
+        job = dict(candidates[i])
+        job["match_score"] = round(100 * scores[i] / best)
+        ranked.append(job)
+    return ranked
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.utils.storage import data_path
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cache_key(position: str, location: str, max_jobs: int = 0, sources: Sequence[str] = ()) -> str:
+    key = f"{normalize_query(position)}|{normalize_query(location)}|{max_jobs}"
+    # Keys of the default Indeed-only setup stay unchanged
+    if sources and list(sources) != ["indeed"]:
+        key += "|" + ",".join(sorted(sources))
+    return key
+
+
+class ScrapeCache:
+    """Two-level cache of scraped jobs: an in-memory LRU in front of SQLite.
+
+    Entries are fresh for ``ttl`` seconds and may still be served, while a
+    background refresh runs, for another ``stale_ttl`` seconds.
+    """
+
+    def __init__(self, db_path: Optional[str], max_entries: int = 256, ttl: float = 3600,
+                 stale_ttl: float = 86400):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._memory: "OrderedDict[str, Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Metrics; every lookup counts in exactly one of the first four
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @property
+    def db(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.db_path:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_cache ("
+                "key TEXT PRIMARY KEY, jobs TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, jobs: List[Dict[str, Any]], stored_at: float):
+        # Caller must hold the lock
+        self._memory[key] = (jobs, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Return ``(jobs, age_seconds)`` if the key is cached and not fully expired.
+
+        Fresh hits count as memory or disk hits, entries past ``ttl`` as stale hits.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            from_disk = False
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self.db is not None:
+                row = self.db.execute(
+                    "SELECT jobs, stored_at FROM scrape_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, *entry)
+                    from_disk = True
+
+            if entry is None or now - entry[1] > self.ttl + self.stale_ttl:
+                self.misses += 1
+                return None
+            if now - entry[1] > self.ttl:
+                self.stale_hits += 1
+            elif from_disk:
+                self.disk_hits += 1
+            else:
+                self.memory_hits += 1
+            return entry[0], now - entry[1]
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since ``key`` was stored, or None if it isn't cached. Not counted in the stats."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                return time.time() - entry[1]
+            if self.db is not None:
+                row = self.db.execute("SELECT stored_at FROM scrape_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    return time.time() - row[0]
+        return None
+
+    def store(self, key: str, jobs: List[Dict[str, Any]]):
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, jobs, stored_at)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO scrape_cache (key, jobs, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(jobs, ensure_ascii=False), stored_at)
+                )
+                self.db.commit()
+
+    def purge_expired(self) -> int:
+        """Delete fully expired entries from SQLite."""
+        if self.db is None:
+            return 0
+        cutoff = time.time() - self.ttl - self.stale_ttl
+        with self._lock:
+            deleted = self.db.execute("DELETE FROM scrape_cache WHERE stored_at < ?", (cutoff,)).rowcount
+            self.db.commit()
+        return deleted
+
+    async def get_or_scrape(self, key: str, scrape: Callable[[], Awaitable[List[Dict[str, Any]]]],
+                            refresh: Optional[Callable[[], Awaitable[List[Dict[str, Any]]]]] = None
+                            ) -> Tuple[List[Dict[str, Any]], str]:
+        """Serve ``key`` from the cache, calling ``scrape()`` on a miss.
+
+        Returns ``(jobs, source)`` where source is "fresh", "stale" or "live".
+        Stale entries are returned immediately and refreshed in the background
+        with ``refresh()`` (``scrape()`` if not given). Empty scrape results are
+        not cached. SQLite reads and writes run in a worker thread.
+        """
+        cached = await asyncio.to_thread(self.lookup, key)
+        if cached is not None:
+            jobs, age = cached
+            if age <= self.ttl:
+                return jobs, "fresh"
+            self._schedule_refresh(key, refresh or scrape)
+            return jobs, "stale"
+
+        jobs = await scrape()
+        if jobs:
+            await asyncio.to_thread(self.store, key, jobs)
+        return jobs, "live"
+
+    def _schedule_refresh(self, key: str, scrape: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                jobs = await scrape()
+                if jobs:
+                    await asyncio.to_thread(self.store, key, jobs)
+                    self.refreshes += 1
+            except Exception:
+                pass
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits + self.stale_hits
+        lookups = hits + self.misses
+        return {
+            "entries_in_memory": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+
+scrape_cache = ScrapeCache(
+    db_path=data_path("scrape_cache.sqlite3") if os.getenv("SCRAPE_CACHE_DISK", "1") == "1" else None,
+    max_entries=int(os.getenv("SCRAPE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SCRAPE_CACHE_TTL", "3600")),
+    stale_ttl=float(os.getenv("SCRAPE_CACHE_STALE_TTL", "86400"))
+)
@@ -0,0 +1,210 @@
+import os
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+# NumPy is optional; without it local matching falls back to the BM25 ranking
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.services.fanout import job_fingerprint
+from app.services.ranking import TITLE_WEIGHT, passes_filters, tokenize
+
+# Character n-grams catch related word forms ("developer", "development")
+CHAR_NGRAM = 3
+CHAR_NGRAM_WEIGHT = 0.5
+BIGRAM_WEIGHT = 1.0
+
+
+def available() -> bool:
+    return np is not None
+
+
+class HashingEmbedder:
+    """Embeds text as signed hashed n-gram counts in a fixed number of dimensions.
+
+    Features are words, adjacent word pairs and character trigrams of each
+    word. Counts are log-scaled and vectors L2-normalized, so a dot product
+    is the cosine similarity. No vocabulary is kept, so any text can be
+    embedded without fitting.
+    """
+
+    def __init__(self, dim: int = 2048):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+
+    def features(self, tokens: List[str]):
+        for token in tokens:
+            yield token, 1.0
+            padded = f"<{token}>"
+            for i in range(len(padded) - CHAR_NGRAM + 1):
+                yield "#" + padded[i:i + CHAR_NGRAM], CHAR_NGRAM_WEIGHT
+        for first, second in zip(tokens, tokens[1:]):
+            yield f"{first} {second}", BIGRAM_WEIGHT
+
+    def embed_tokens(self, tokens: List[str]) -> "np.ndarray":
+        indices = []
+        weights = []
+        for feature, weight in self.features(tokens):
+            # crc32 is stable across processes, unlike hash()
+            digest = zlib.crc32(feature.encode("utf-8"))
+            indices.append(digest & (self.dim - 1))
+            weights.append(weight if digest & 0x80000000 else -weight)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if indices:
+            counts = np.bincount(indices, weights=weights, minlength=self.dim)
+            vector[:] = np.sign(counts) * np.log1p(np.abs(counts))
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+    def embed_job(self, job: Dict[str, Any]) -> "np.ndarray":
+        tokens = tokenize(str(job.get("job_title", job.get("title", "")))) * TITLE_WEIGHT
+        tokens += tokenize(str(job.get("skills_required", "")))
+        tokens += tokenize(str(job.get("job_description", job.get("description", ""))))
+        return self.embed_tokens(tokens)
+
+    def embed_query(self, user_input: Dict[str, Any]) -> "np.ndarray":
+        return self.embed_tokens(tokenize(str(user_input.get("position", "")))
+                                 + tokenize(str(user_input.get("skills", ""))))
+
+
+class SemanticIndex:
+    """Job embeddings in one NumPy matrix, ranked by cosine similarity.
+
+    Jobs are added as they are scraped and keyed by their cross-source
+    fingerprint; adding a job again re-embeds it only if its text changed.
+    Ranking embeds just the query and scores all rows in one matrix-vector
+    product. Beyond ``max_jobs`` rows the oldest quarter is dropped; the
+    matrix grows up to ``max_jobs * dim * 4`` bytes (40 MiB by default).
+    """
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None, max_jobs: int = 5000):
+        self.embedder = embedder or HashingEmbedder()
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        rows = min(256, max_jobs)
+        self._matrix = np.zeros((rows, self.embedder.dim), dtype=np.float32) if np is not None else None
+        self._size = 0
+        self._rows: Dict[str, int] = {}
+        self._jobs: List[Dict[str, Any]] = []
+        self._texts: List[int] = []
+
+        # Metrics
+        self.embedded = 0
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _text_digest(job: Dict[str, Any]) -> int:
+        text = "\n".join(str(job.get(field, "")) for field in ("job_title", "skills_required", "job_description"))
+        return zlib.crc32(text.encode("utf-8"))
+
+    def _grow(self):
+        # Caller must hold the lock
+        if self._size == len(self._matrix):
+            # Never allocate more rows than the cap
+            matrix = np.zeros((min(len(self._matrix) * 2, self.max_jobs), self.embedder.dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+
+    def _evict_oldest(self):
+        # Caller must hold the lock
+        keep = self._size - self._size // 4
+        drop = self._size - keep
+        self._matrix[:keep] = self._matrix[drop:self._size]
+        self._jobs = self._jobs[drop:]
+        self._texts = self._texts[drop:]
+        self._size = keep
+        self._rows = {job_fingerprint(job): row for row, job in enumerate(self._jobs)}
+
+    def add(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """Add or update jobs. Returns their keys."""
+        keyed = [(job_fingerprint(job), self._text_digest(job), job) for job in jobs]
+        with self._lock:
+            pending = [(key, digest, job) for key, digest, job in keyed
+                       if key not in self._rows or self._texts[self._rows[key]] != digest]
+        # Embed outside the lock, it is the slow part
+        vectors = [self.embedder.embed_job(job) for _, _, job in pending]
+
+        with self._lock:
+            for (key, digest, job), vector in zip(pending, vectors):
+                row = self._rows.get(key)
+                if row is None:
+                    if self._size >= self.max_jobs:
+                        self._evict_oldest()
+                    self._grow()
+                    row = self._size
+                    self._size += 1
+                    self._rows[key] = row
+                    self._jobs.append(job)
+                    self._texts.append(digest)
+                else:
+                    self._jobs[row] = job
+                    self._texts[row] = digest
+                self._matrix[row] = vector
+            # Other fields (salary, link) may have changed without the text
+            for key, _, job in keyed:
+                if key in self._rows:
+                    self._jobs[self._rows[key]] = job
+            self.embedded += len(pending)
+        return [key for key, _, _ in keyed]
+
+    def _ranked(self, user_input: Dict[str, Any], keys: List[str], top_k: Optional[int]
+                ) -> List[Dict[str, Any]]:
+        query = self.embedder.embed_query(user_input)
+        with self._lock:
+            # Keys evicted by a concurrent add are skipped
+            rows = list(dict.fromkeys(self._rows[key] for key in keys if key in self._rows))
+            scores = self._matrix[rows] @ query
+            jobs = [self._jobs[row] for row in rows]
+        self.searches += 1
+
+        ranked = []
+        for i in np.argsort(-scores, kind="stable"):
+            if not passes_filters(user_input, jobs[i]):
+                continue
+            job = dict(jobs[i])
+            job["match_score"] = float(scores[i])
+            ranked.append(job)
+            if top_k is not None and len(ranked) >= top_k:
+                break
+
+        # Scores relative to the best job, like the BM25 ranking
+        best = ranked[0]["match_score"] if ranked and ranked[0]["match_score"] > 0 else 1.0
+        for job in ranked:
+            job["match_score"] = max(0, round(100 * job["match_score"] / best))
+        return ranked
+
+    def rank(self, user_input: Dict[str, Any], jobs: List[Dict[str, Any]],
+             top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Filter and rank ``jobs`` by similarity to the user's position and skills.
+
+        Jobs not indexed yet are added first. Returns copies of the best
+        ``top_k`` jobs (all if None), best first, each with a ``match_score``
+        between 0 and 100.
+        """
+        if not jobs:
+            return []
+        return self._ranked(user_input, self.add(jobs), top_k)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": available(),
+            "jobs": self._size,
+            "dimensions": self.embedder.dim,
+            "embedded": self.embedded,
+            "searches": self.searches
+        }
+
+
+semantic_index = SemanticIndex(
+    HashingEmbedder(dim=int(os.getenv("SEMANTIC_DIM", "2048"))),
+    max_jobs=int(os.getenv("SEMANTIC_INDEX_SIZE", "5000"))
+)
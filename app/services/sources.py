@@ -0,0 +1,159 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from app.scraper.browser_pool import browser_pool
+from app.scraper.indeed import MAX_JOBS, iter_indeed_jobs
+from app.scraper.indeed_http import CloudflareBlocked, PageShapeError, aiter_indeed_jobs_http
+from app.scraper.waits import ScrapeTimings
+from app.services.executor import scrape_pool
+
+
+class SearchQuery(NamedTuple):
+    position: str
+    location: str
+    max_jobs: int = 0
+
+
+class JobSource:
+    """A site jobs can be searched on.
+
+    Subclasses implement ``search``, yielding job dicts (the fields produced by
+    ``extract_job_data``) as soon as each one is available. ``timeout`` bounds
+    how long the fan-out waits for this source in one search.
+    """
+
+    name = "source"
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout is not None else float(os.getenv("SCRAPE_SOURCE_TIMEOUT", "120"))
+
+    def search(self, query: SearchQuery, timings: Optional[ScrapeTimings] = None) -> AsyncIterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class IndeedSource(JobSource):
+    """Indeed, crawled with the pooled browsers in the scrape worker pool.
+
+    In "http" mode (SCRAPE_MODE) result and detail pages are fetched without
+    a browser, reusing the cached Cloudflare cookies; the browser takes over
+    for the rest of the search if a page isn't recognized or stays blocked.
+    """
+
+    def __init__(self, region: str = "pk", timeout: Optional[float] = None, mode: Optional[str] = None):
+        super().__init__(timeout)
+        self.region = region
+        self.name = "indeed" if region == "pk" else f"indeed:{region}"
+        self.base_url = f"https://{region}.indeed.com"
+        self.mode = mode or os.getenv("SCRAPE_MODE", "browser")
+
+    async def search(self, query, timings=None):
+        max_jobs = query.max_jobs or MAX_JOBS
+        seen_keys = set()
+        if self.mode == "http":
+            try:
+                async for job in self._search_http(query, timings):
+                    seen_keys.add(job["job_key"])
+                    yield job
+                return
+            except (CloudflareBlocked, PageShapeError, httpx.HTTPError):
+                pass
+
+        job_count = len(seen_keys)
+        async for job in scrape_pool.iterate(iter_indeed_jobs, query.position, query.location,
+                                             max_jobs, timings, None, self.base_url):
+            if job.get("job_key") in seen_keys:
+                continue
+            yield job
+            job_count += 1
+            if job_count >= max_jobs:
+                return
+
+    async def _search_http(self, query, timings):
+        cf_session = await scrape_pool.run(browser_pool.cloudflare_session)
+        yielded = False
+        try:
+            async for job in aiter_indeed_jobs_http(query.position, query.location, cf_session,
+                                                    query.max_jobs, timings, self.base_url):
+                yielded = True
+                yield job
+        except CloudflareBlocked:
+            if yielded:
+                raise
+            # Cached cookies were rejected: solve the challenge again and retry once
+            cf_session = await scrape_pool.run(browser_pool.cloudflare_session, True)
+            async for job in aiter_indeed_jobs_http(query.position, query.location, cf_session,
+                                                    query.max_jobs, timings, self.base_url):
+                yield job
+
+
+class FakeSource(JobSource):
+    """Offline source returning canned or generated jobs, for local runs and tests.
+
+    Without ``jobs`` it makes up ``max_jobs`` (default 5) jobs for the query.
+    ``delay`` seconds pass before each job, and ``fail`` raises after the jobs.
+    """
+
+    def __init__(self, name: str = "fake", jobs: Optional[List[Dict[str, Any]]] = None,
+                 delay: float = 0.0, fail: bool = False, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.name = name
+        self.jobs = jobs
+        self.delay = delay
+        self.fail = fail
+
+    def _make_jobs(self, query: SearchQuery) -> List[Dict[str, Any]]:
+        return [
+            {
+                "job_id": i,
+                "job_title": f"{query.position.title()} {i}",
+                "company": f"Fake Company {i}",
+                "location": query.location,
+                "salary": "Not specified",
+                "job_type": "Full-time",
+                "experience_required": f"{i} years",
+                "job_nature": "Not specified",
+                "apply_link": f"https://example.com/jobs/{self.name}/{i}",
+                "job_description": f"{query.position} role at Fake Company {i} in {query.location}.",
+                "job_key": f"{self.name}-{i}"
+            }
+            for i in range(1, (query.max_jobs or 5) + 1)
+        ]
+
+    async def search(self, query, timings=None):
+        jobs = self.jobs if self.jobs is not None else self._make_jobs(query)
+        for job in jobs:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield dict(job)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+
+
+# Source types by name; a spec like "indeed:uk" passes "uk" to the factory
+SOURCE_TYPES: Dict[str, Callable[..., JobSource]] = {
+    "indeed": IndeedSource,
+    "fake": FakeSource,
+}
+
+
+def register_source_type(name: str, factory: Callable[..., JobSource]):
+    SOURCE_TYPES[name] = factory
+
+
+def create_source(spec: str) -> JobSource:
+    name, _, argument = spec.strip().partition(":")
+    if name not in SOURCE_TYPES:
+        raise ValueError(f"Unknown job source {name!r}")
+    return SOURCE_TYPES[name](argument) if argument else SOURCE_TYPES[name]()
+
+
+def sources_from_env() -> List[JobSource]:
+    """The sources listed in SCRAPE_SOURCES (comma separated, default "indeed")."""
+    specs = os.getenv("SCRAPE_SOURCES", "indeed").split(",")
+    return [create_source(spec) for spec in specs if spec.strip()]
+
+
+job_sources = sources_from_env()
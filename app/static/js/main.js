@@ -13,7 +13,12 @@ const jobCount = document.getElementById('jobCount');
 
 // State variables
 let isSearching = false;
+let currentSearchId = null;
 let statusCheckInterval = null;
+let eventSource = null;
+let streamedJobs = 0;
+let showingScrapedJobs = false;
+let resultsCursor = 0;
 let lastProgress = 0;
 
 // Add event listeners
@@ -52,7 +57,8 @@ async function handleFormSubmit(event) {
             throw new Error(data.error || 'Failed to start job search');
         }
         
-        // Start checking status
+        // Start checking status of this search
+        currentSearchId = data.search_id;
         startStatusCheck();
         
     } catch (error) {
@@ -61,8 +67,72 @@ async function handleFormSubmit(event) {
     }
 }
 
-// Check status periodically
+// Follow search progress, pushed by the server when EventSource is available
 function startStatusCheck() {
+    if (window.EventSource) {
+        startEventStream();
+    } else {
+        startPolling();
+    }
+}
+
+// Subscribe to the search's Server-Sent Events
+function startEventStream() {
+    eventSource = new EventSource(`/api/events/${currentSearchId}`);
+    
+    eventSource.addEventListener('progress', event => {
+        updateProgressUI(JSON.parse(event.data));
+    });
+    
+    // Show scraped jobs as they arrive, then replace them with matches
+    eventSource.addEventListener('job', event => {
+        appendStreamedJob(JSON.parse(event.data), true);
+    });
+    
+    eventSource.addEventListener('match', event => {
+        appendStreamedJob(JSON.parse(event.data));
+    });
+    
+    // AI matching failed part way; the locally ranked matches follow
+    eventSource.addEventListener('matches_reset', () => {
+        clearStreamedMatches();
+    });
+    
+    eventSource.addEventListener('done', event => {
+        closeEventStream();
+        updateProgressUI(JSON.parse(event.data));
+        fetchResults();
+    });
+    
+    eventSource.addEventListener('search_error', event => {
+        closeEventStream();
+        updateProgressUI(JSON.parse(event.data));
+    });
+    
+    // The browser reconnects by itself; fall back to polling if it gives up
+    eventSource.onerror = () => {
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+            closeEventStream();
+            startPolling();
+        }
+    };
+}
+
+function closeEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+// Check status periodically
+function startPolling() {
+    // Polling replays every job from the start of the search
+    resultsContainer.innerHTML = '';
+    streamedJobs = 0;
+    showingScrapedJobs = false;
+    resultsCursor = 0;
+    
     // First check quickly (200ms)
     statusCheckInterval = setInterval(checkStatus, 200);
     
@@ -73,17 +143,28 @@ function startStatusCheck() {
     }, 2000);
 }
 
-// Check current status of the job search
+// Check current status and pick up jobs produced since the last check
 async function checkStatus() {
     try {
-        const response = await fetch('/api/status');
+        const response = await fetch(`/api/results/${currentSearchId}?cursor=${resultsCursor}`);
         const data = await response.json();
         
+        if (!response.ok) {
+            throw new Error(data.detail || 'Search not found');
+        }
+        
+        resultsCursor = data.next_cursor;
+        data.jobs.forEach(job => appendStreamedJob(job, true));
+        if (data.matches_reset) {
+            clearStreamedMatches();
+        }
+        data.matches.forEach(job => appendStreamedJob(job));
+        
         // Update progress UI
-        updateProgressUI(data);
+        updateProgressUI(data.status);
         
         // If finished, show results
-        if (!data.is_scraping) {
+        if (data.done) {
             clearInterval(statusCheckInterval);
             fetchResults();
         }
@@ -98,11 +179,11 @@ async function checkStatus() {
 // Fetch results when job search is complete
 async function fetchResults() {
     try {
-        const response = await fetch('/api/results');
+        const response = await fetch(`/api/results/${currentSearchId}`);
         
         if (!response.ok) {
             const errorData = await response.json();
-            throw new Error(errorData.error || 'Failed to fetch results');
+            throw new Error(errorData.error || errorData.detail || 'Failed to fetch results');
         }
         
         const results = await response.json();
@@ -134,6 +215,7 @@ function updateProgressUI(status) {
     if (status.error) {
         showError(status.error);
         clearInterval(statusCheckInterval);
+        closeEventStream();
         resetSearchState();
     }
 }
@@ -189,53 +271,90 @@ function displayResults(jobs) {
     
     // Add each job card
     jobs.forEach(job => {
-        const companyInitial = job.company_name ? job.company_name.charAt(0) : 
-                              (job.company ? job.company.charAt(0) : '?');
-        
-        const jobTitle = job.job_title || job.title || 'Unknown Title';
-        const company = job.company_name || job.company || 'Unknown Company';
-        const location = job.location || 'Not specified';
-        const salary = job.salary || 'Not specified';
-        const jobType = job.job_type || 'Not specified';
-        const description = job.description || job.job_description || 'No description available';
-        const applyLink = job.apply_link || '#';
-        
-        const jobCard = document.createElement('div');
-        jobCard.className = 'col-md-6';
-        jobCard.innerHTML = `
-            <div class="card job-card h-100 shadow-sm">
-                <div class="card-body">
-                    <div class="d-flex mb-3">
-                        <div class="company-logo me-3">
-                            ${companyInitial}
-                        </div>
-                        <div>
-                            <h5 class="card-title mb-1">${jobTitle}</h5>
-                            <div class="text-muted">${company}</div>
-                        </div>
+        resultsContainer.appendChild(createJobCard(job));
+    });
+}
+
+// Add a single job card while results are still streaming in
+function appendStreamedJob(job, scraped = false) {
+    if (scraped && streamedJobs > 0 && !showingScrapedJobs) {
+        // Matches are already on screen
+        return;
+    }
+    if (!scraped && showingScrapedJobs) {
+        // The first match replaces the unranked scraped jobs
+        resultsContainer.innerHTML = '';
+        streamedJobs = 0;
+    }
+    showingScrapedJobs = scraped;
+    
+    resultsSection.classList.remove('d-none');
+    streamedJobs += 1;
+    jobCount.textContent = `${streamedJobs} jobs`;
+    resultsContainer.appendChild(createJobCard(job));
+}
+
+// Remove the streamed matches so replacement matches start from an empty list
+function clearStreamedMatches() {
+    if (!showingScrapedJobs) {
+        resultsContainer.innerHTML = '';
+        streamedJobs = 0;
+    }
+}
+
+// Build the card element for one job
+function createJobCard(job) {
+    const companyInitial = job.company_name ? job.company_name.charAt(0) : 
+                          (job.company ? job.company.charAt(0) : '?');
+    
+    const jobTitle = job.job_title || job.title || 'Unknown Title';
+    const company = job.company_name || job.company || 'Unknown Company';
+    const location = job.location || 'Not specified';
+    const salary = job.salary || 'Not specified';
+    const jobType = job.job_type || 'Not specified';
+    const description = job.description || job.job_description || 'No description available';
+    const applyLink = job.apply_link || '#';
+    const matchScore = Number.isFinite(job.match_score) ? `${job.match_score}% match` : '';
+    const rationale = job.rationale || '';
+    
+    const jobCard = document.createElement('div');
+    jobCard.className = 'col-md-6';
+    jobCard.innerHTML = `
+        <div class="card job-card h-100 shadow-sm">
+            <div class="card-body">
+                <div class="d-flex mb-3">
+                    <div class="company-logo me-3">
+                        ${companyInitial}
                     </div>
-                    
-                    <div class="mb-3">
-                        <span class="badge badge-job-type me-2">${jobType}</span>
-                        <span class="badge badge-job-type badge-location me-2">
-                            <i class="bi bi-geo-alt"></i> ${location}
-                        </span>
-                        <span class="badge badge-job-type badge-salary">
-                            <i class="bi bi-cash"></i> ${salary}
-                        </span>
+                    <div>
+                        <h5 class="card-title mb-1">${jobTitle}</h5>
+                        <div class="text-muted">${company}</div>
                     </div>
-                    
-                    <p class="card-text job-description mb-3">${description}</p>
-                    
-                    <a href="${applyLink}" target="_blank" class="btn btn-sm btn-primary apply-btn">
-                        <i class="bi bi-box-arrow-up-right"></i> Apply Now
-                    </a>
                 </div>
+                
+                <div class="mb-3">
+                    <span class="badge badge-job-type me-2">${jobType}</span>
+                    <span class="badge badge-job-type badge-location me-2">
+                        <i class="bi bi-geo-alt"></i> ${location}
+                    </span>
+                    <span class="badge badge-job-type badge-salary">
+                        <i class="bi bi-cash"></i> ${salary}
+                    </span>
+                    ${matchScore ? `<span class="badge bg-success ms-2">${matchScore}</span>` : ''}
+                </div>
+                
+                ${rationale ? `<p class="small text-muted fst-italic mb-2">${rationale}</p>` : ''}
+                
+                <p class="card-text job-description mb-3">${description}</p>
+                
+                <a href="${applyLink}" target="_blank" class="btn btn-sm btn-primary apply-btn">
+                    <i class="bi bi-box-arrow-up-right"></i> Apply Now
+                </a>
             </div>
-        `;
-        
-        resultsContainer.appendChild(jobCard);
-    });
+        </div>
+    `;
+    
+    return jobCard;
 }
 
 // Show error message
@@ -263,8 +382,12 @@ function resetUI() {
     resultsSection.classList.add('d-none');
     resultsContainer.innerHTML = '';
     lastProgress = 0;
+    streamedJobs = 0;
+    showingScrapedJobs = false;
+    resultsCursor = 0;
     
     if (statusCheckInterval) {
         clearInterval(statusCheckInterval);
     }
+    closeEventStream();
 } 
\ No newline at end of file
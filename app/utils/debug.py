@@ -0,0 +1,32 @@
+import json
+import os
+from typing import Any, Optional
+
+
+def dump_debug_json(file_name: str, data: Any) -> Optional[str]:
+    """Write data as JSON into DEBUG_DUMP_DIR, if that variable is set.
+
+    Returns the path written, or None when debug dumps are disabled.
+    """
+    dump_dir = os.getenv("DEBUG_DUMP_DIR")
+    if not dump_dir:
+        return None
+
+    os.makedirs(dump_dir, exist_ok=True)
+    path = os.path.join(dump_dir, file_name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    return path
+
+
+def dump_debug_text(file_name: str, text: str) -> Optional[str]:
+    """Write raw text (e.g. scraped HTML) into DEBUG_DUMP_DIR, if that variable is set."""
+    dump_dir = os.getenv("DEBUG_DUMP_DIR")
+    if not dump_dir:
+        return None
+
+    path = os.path.join(dump_dir, file_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
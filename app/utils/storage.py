@@ -0,0 +1,7 @@
+import os
+
+
+def data_path(file_name: str) -> str:
+    """Path of a file in the app's data directory (JOB_FINDER_DATA_DIR, default ./data)."""
+    data_dir = os.getenv("JOB_FINDER_DATA_DIR", "data")
+    return os.path.join(data_dir, file_name)
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.services.fanout import fan_out, job_fingerprint
+from app.services.sources import FakeSource, SearchQuery
+
+QUERY = SearchQuery("python developer", "Karachi", 3)
+
+
+def shared_job(i, **fields):
+    job = {"job_title": f"Python Developer {i}", "company": f"Acme {i}", "location": "Karachi"}
+    job.update(fields)
+    return job
+
+
+def test_fan_out_drops_jobs_seen_from_another_source():
+    first = FakeSource("first", jobs=[shared_job(1), shared_job(2)])
+    # Same postings with different case and punctuation, plus one new job
+    second = FakeSource("second", jobs=[shared_job(1, job_title="python developer 1!"),
+                                        shared_job(3)], delay=0.01)
+    streamed = []
+
+    jobs, stats = asyncio.run(fan_out(QUERY, [first, second], streamed.append))
+
+    assert [job["job_title"] for job in jobs] == ["Python Developer 1", "Python Developer 2",
+                                                  "Python Developer 3"]
+    assert [job["source"] for job in jobs] == ["first", "first", "second"]
+    assert streamed == jobs
+    assert len({job_fingerprint(job) for job in jobs}) == len(jobs)
+    assert stats["first"]["jobs"] == 2 and stats["first"]["duplicates"] == 0
+    assert stats["second"]["jobs"] == 1 and stats["second"]["duplicates"] == 1
+
+
+def test_fan_out_keeps_jobs_of_a_failing_source():
+    broken = FakeSource("broken", jobs=[shared_job(1), shared_job(2)], fail=True)
+    jobs, stats = asyncio.run(fan_out(QUERY, [FakeSource("ok"), broken]))
+
+    assert len(jobs) == 5
+    assert stats["ok"]["status"] == "ok"
+    assert stats["broken"]["status"] == "error"
+    assert stats["broken"]["jobs"] == 2
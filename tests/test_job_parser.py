@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from app.scraper.job_parser import available_backends, parse_job_detail
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "detail_pages")
+
+EXPECTED = {
+    # Detail page: "- job post" span in the title, svg icon inside the company link
+    "viewjob_full.html": {
+        "job_title": "Senior Python Developer",
+        "company": "Acme Technologies",
+        "salary": "Pay: Rs 250,000.00 - Rs 350,000.00 per month",
+        "job_type": "Full-time, Permanent",
+        "experience_required": "4+ years of professional Python experience",
+    },
+    # Description pane with the data-company-name header and a PKR salary
+    "pane_company_name.html": {
+        "job_title": "Accounts Officer",
+        "company": "Northwind Traders",
+        "salary": "Salary: PKR 60,000 - 80,000 per month",
+        "job_type": "Full-time",
+        "experience_required": "Minimum 2 years of experience in a similar role",
+    },
+    # Missing fields keep their defaults
+    "pane_minimal.html": {
+        "job_title": "Delivery Rider",
+        "company": "Not specified",
+        "salary": "Not specified",
+        "job_type": "Not specified",
+        "experience_required": "Not specified",
+    },
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_backend_extracts_fields(backend, name):
+    detail = parse_job_detail(load_fixture(name), backend=backend)
+    assert {field: detail[field] for field in EXPECTED[name]} == EXPECTED[name]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_backend_description_matches_bs4(backend, name):
+    html = load_fixture(name)
+    assert parse_job_detail(html, backend=backend)["description_text"] == \
+        parse_job_detail(html, backend="bs4")["description_text"]
+
+
+def test_description_excludes_scripts_and_styles():
+    text = parse_job_detail(load_fixture("viewjob_full.html"), backend="bs4")["description_text"]
+    assert "Senior Python Developer" in text
+    assert "_initialData" not in text
+    assert "display: block" not in text
+
+
+def test_given_description_text_is_kept():
+    detail = parse_job_detail(load_fixture("pane_minimal.html"), description_text="From the browser")
+    assert detail["description_text"] == "From the browser"
+
+
+def test_empty_html_returns_defaults():
+    detail = parse_job_detail("  ")
+    assert detail["job_title"] == "Unknown Title"
+    assert detail["company"] == "Not specified"